@@ -0,0 +1,90 @@
+import os
+import random
+import time
+import datetime
+import calendar
+from types import SimpleNamespace
+
+import django
+
+# Setup Django (only settings/timezone are needed, no database access)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esports_calendar.settings')
+django.setup()
+
+from django.utils import timezone
+from calendar_app.calendar_engine import month_grid
+from calendar_app.conflicts import interval, overlapping_pairs
+
+YEAR, MONTH = 2026, 3
+SIZES = [10_000, 100_000]
+REPEAT = 5
+
+
+def make_events(count, seed=42):
+    # Events spread over one year around the benchmarked month, ~10% multi-day
+    rng = random.Random(seed)
+    origin = timezone.make_aware(datetime.datetime(YEAR, 1, 1))
+    events = []
+    for i in range(count):
+        start = origin + datetime.timedelta(minutes=rng.randrange(365 * 24 * 60))
+        end = start + datetime.timedelta(days=rng.randint(1, 4)) if rng.random() < 0.1 else None
+        events.append(SimpleNamespace(id=i, title=f'Event {i}', start_time=start, end_time=end))
+    return events
+
+
+def make_schedule(count, seed=7):
+    # One team's back-to-back schedule: 1h events every 3h, ~2% double-booked
+    rng = random.Random(seed)
+    origin = timezone.make_aware(datetime.datetime(YEAR, 1, 1))
+    events = []
+    for i in range(count):
+        start = origin + datetime.timedelta(hours=3 * i)
+        if rng.random() < 0.02:
+            start -= datetime.timedelta(hours=2, minutes=30)
+        events.append(SimpleNamespace(id=i, title=f'Event {i}', start_time=start, end_time=start + datetime.timedelta(hours=1)))
+    return events
+
+
+def legacy_grid(year, month, events):
+    # The per-cell scan the dashboard used before calendar_engine
+    weeks = []
+    for week in calendar.monthcalendar(year, month):
+        week_data = []
+        for day in week:
+            if day == 0:
+                week_data.append({'day': 0, 'events': []})
+            else:
+                day_events = [e for e in events if e.start_time.year == year and e.start_time.month == month and e.start_time.day == day]
+                week_data.append({'day': day, 'events': day_events})
+        weeks.append(week_data)
+    return weeks
+
+
+def best_of(fn, *args):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def bench():
+    print(f"Month grid build for {calendar.month_name[MONTH]} {YEAR}, best of {REPEAT} (ms)")
+    print(f"{'events':>10} {'legacy scan':>14} {'bucketed':>10}")
+    for size in SIZES:
+        events = make_events(size)
+        legacy = best_of(legacy_grid, YEAR, MONTH, events)
+        bucketed = best_of(month_grid, YEAR, MONTH, events)
+        print(f"{size:>10} {legacy:>14.1f} {bucketed:>10.1f}")
+
+    print(f"\nConflict sweep over one team's events, best of {REPEAT} (ms)")
+    print(f"{'events':>10} {'sweep':>10} {'clashes':>10}")
+    for size in SIZES:
+        intervals = [interval(e) for e in make_schedule(size)]
+        swept = best_of(overlapping_pairs, intervals)
+        print(f"{size:>10} {swept:>10.1f} {len(overlapping_pairs(intervals)):>10}")
+
+
+if __name__ == '__main__':
+    bench()
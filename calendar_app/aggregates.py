@@ -0,0 +1,47 @@
+from django.db.models import Count, Prefetch, prefetch_related_objects
+
+from .models import RSVP
+
+
+def rsvp_counts(event_ids):
+    # {event_id: {status: n} for every status}, from one query grouped by (event_id, status)
+    counts = {event_id: {status: 0 for status, _ in RSVP.STATUS_CHOICES} for event_id in event_ids}
+    if not counts:
+        return counts
+    rows = (
+        RSVP.objects.filter(event_id__in=counts)
+        .values_list('event_id', 'status')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for event_id, status, n in rows:
+        counts[event_id][status] = n
+    return counts
+
+
+def attach_rsvp_counts(events, with_attendees=False):
+    """
+    Set ``rsvp_counts`` ({status: n} for every status) on each event using a
+    single query grouped by (event_id, status). With ``with_attendees``,
+    ``attendees`` lists the attending users via one extra prefetch query.
+    The number of queries does not depend on how many events are passed.
+    """
+    events = list(events)
+    if not events:
+        return events
+
+    counts = rsvp_counts({event.id for event in events})
+    for event in events:
+        event.rsvp_counts = counts[event.id]
+
+    if with_attendees:
+        attending = (
+            RSVP.objects.filter(status='attending')
+            .select_related('user')
+            .only('id', 'event', 'user__id', 'user__username')
+            .order_by('user__username')
+        )
+        prefetch_related_objects(events, Prefetch('rsvps', queryset=attending, to_attr='attending_rsvps'))
+        for event in events:
+            event.attendees = [rsvp.user for rsvp in event.attending_rsvps]
+    return events
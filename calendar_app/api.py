@@ -0,0 +1,224 @@
+"""
+Read-only JSON API for events, RSVPs, teams and match registrations.
+
+    GET /api/<resource>/?limit=100&after=<cursor>&fields=id,title&compact=1
+    GET /api/<resource>/?since=<cursor>
+
+Lists are keyset-paginated in the resource's natural order ((start_time, id)
+for events, (created_at, id) for teams and registrations, (updated_at, id)
+for RSVPs): follow ``next`` until it is null. ``since`` switches to change
+order, (updated_at, id); pass an empty value for a full sync, then keep the
+returned ``since`` cursor and poll with it to fetch only rows changed since.
+Retagging an event or changing a team's members counts as a change to that
+event or team. Deletions are not reported.
+
+Bots authenticate with "Authorization: Bearer <token>" using a token from
+`manage.py api_token <username>`. Calendar feed tokens are not accepted:
+feed URLs get pasted into third-party calendar services.
+"""
+import datetime
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .event_windows import decode_cursor
+from .models import RSVP, Event, MatchRegistration, Team, User
+from .team_scope import for_teams, is_admin, team_ids_for
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+# Distinct from the calendar feed salt, so a feed token is never an API credential
+API_TOKEN_SALT = 'calendar_app.api'
+
+
+class Resource:
+    """
+    One API collection: ``fields`` are model columns served through
+    values(); ``many`` maps extra fields to (through model, own column,
+    related column) and are filled with one query per page.
+    """
+
+    def __init__(self, model, order_field, fields, many=None, admin_only=False, owner_field=None, team_scoped=False):
+        self.model = model
+        self.order_field = order_field
+        self.fields = fields
+        self.many = many or {}
+        self.admin_only = admin_only
+        self.owner_field = owner_field
+        self.team_scoped = team_scoped
+
+    @property
+    def all_fields(self):
+        return self.fields + tuple(self.many)
+
+    def queryset(self, user):
+        qs = self.model._default_manager.order_by()
+        if self.owner_field and not is_admin(user):
+            qs = qs.filter(**{self.owner_field: user})
+        if self.team_scoped:
+            qs = for_teams(qs, team_ids_for(user))
+        return qs
+
+
+RESOURCES = {
+    'events': Resource(
+        Event, 'start_time',
+        ('id', 'title', 'event_type', 'start_time', 'end_time', 'location',
+         'recurrence', 'recurrence_exceptions', 'created_at', 'updated_at'),
+        many={'teams': (Event.teams.through, 'event_id', 'team_id')},
+        team_scoped=True,
+    ),
+    'rsvps': Resource(
+        RSVP, 'updated_at', ('id', 'user', 'event', 'status', 'updated_at'),
+        owner_field='user',
+    ),
+    'teams': Resource(
+        Team, 'created_at', ('id', 'name', 'created_at', 'updated_at'),
+        many={'members': (Team.members.through, 'team_id', 'user_id')},
+    ),
+    'registrations': Resource(
+        MatchRegistration, 'created_at',
+        ('id', 'user', 'team_name', 'discord_id', 'members', 'created_at', 'updated_at'),
+        admin_only=True,
+    ),
+}
+
+
+def error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def api_token(user):
+    # Valid until the user's api_token_version is bumped (`manage.py api_token --revoke`)
+    return signing.Signer(salt=API_TOKEN_SALT).sign(f'{user.pk}.{user.api_token_version}')
+
+
+def user_from_api_token(token):
+    try:
+        user_id, version = map(int, signing.Signer(salt=API_TOKEN_SALT).unsign(token).split('.'))
+    except (signing.BadSignature, ValueError):
+        return None
+    return User.objects.filter(pk=user_id, api_token_version=version, is_active=True).first()
+
+
+def api_user(request):
+    # Session login, or "Authorization: Bearer <API token>" for bots
+    if request.user.is_authenticated:
+        return request.user
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() == 'bearer' and token:
+        return user_from_api_token(token.strip())
+    return None
+
+
+def encode_cursor(value, pk):
+    # UTC with a Z suffix keeps the cursor URL-safe (no "+" offset)
+    stamp = value.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+    return f"{stamp}_{pk}"
+
+
+def parse_limit(raw):
+    try:
+        return max(1, min(int(raw), MAX_LIMIT))
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+
+
+def parse_fields(resource, raw):
+    if not raw:
+        return resource.all_fields
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    unknown = set(fields) - set(resource.all_fields)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return fields
+
+
+def after(qs, field, cursor):
+    # Rows strictly after the (field, id) keyset position
+    if not cursor:
+        return qs
+    position = decode_cursor(cursor)
+    if position is None:
+        raise ValueError("Invalid cursor")
+    value, pk = position
+    return qs.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+
+
+def attach_many(resource, rows, fields):
+    ids = [row['id'] for row in rows]
+    for name in fields:
+        if name not in resource.many:
+            continue
+        through, own, related = resource.many[name]
+        mapping = defaultdict(list)
+        for own_id, related_id in through.objects.filter(**{f'{own}__in': ids}).values_list(own, related).order_by(related):
+            mapping[own_id].append(related_id)
+        for row in rows:
+            row[name] = mapping[row['id']]
+
+
+def page(resource, user, params):
+    """
+    One page of ``resource`` for ``user`` as a JSON-ready dict. Raises
+    ValueError for bad parameters.
+    """
+    limit = parse_limit(params.get('limit'))
+    fields = parse_fields(resource, params.get('fields'))
+    syncing = 'since' in params
+    order_field = 'updated_at' if syncing else resource.order_field
+
+    qs = after(resource.queryset(user), order_field, params.get('since') if syncing else params.get('after'))
+    columns = [f for f in fields if f not in resource.many]
+    # Keyset columns are always fetched to build cursors, then dropped if not requested
+    rows = list(qs.order_by(order_field, 'id').values(*dict.fromkeys(['id', order_field, *columns]))[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    last = encode_cursor(rows[-1][order_field], rows[-1]['id']) if rows else None
+
+    attach_many(resource, rows, fields)
+    results = [{f: row[f] for f in fields} for row in rows]
+    body = {'next': last if has_more else None}
+    if syncing:
+        # Where the next poll resumes; unchanged when nothing was modified
+        body['since'] = last or params.get('since') or None
+    if params.get('compact') in ('1', 'true'):
+        body['fields'] = list(fields)
+        body['rows'] = [[row[f] for f in fields] for row in results]
+    else:
+        body['results'] = results
+    return body
+
+
+def resource_list(request, resource_name):
+    resource = RESOURCES.get(resource_name)
+    if resource is None:
+        return error("Unknown resource", 404)
+    if request.method not in ('GET', 'HEAD'):
+        return error("Method not allowed", 405)
+    user = api_user(request)
+    if user is None:
+        return error("Authentication required", 401)
+    if resource.admin_only and not is_admin(user):
+        return error("Admins only", 403)
+
+    try:
+        body = page(resource, user, request.GET)
+    except ValueError as exc:
+        return error(str(exc), 400)
+
+    content = json.dumps(body, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    etag = '"%s"' % hashlib.md5(content).hexdigest()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Cookie', 'Authorization'])
+    return response
@@ -0,0 +1,42 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+# Only enabled with a shared cache (see settings.AUTHENTICATION_BACKENDS);
+# the timeout bounds the damage of an invalidation that never arrives
+USER_CACHE_TIMEOUT = 300
+
+
+def user_cache_key(user_id):
+    return f'calendar_app:user:{user_id}'
+
+
+def clear_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user(), which AuthenticationMiddleware calls to
+    turn the session's user id into request.user, reads through the cache.
+    aget_user() does the same for request.auser() in async views.
+    Logged-in requests skip the User query; the entry is dropped whenever
+    the User row is saved or deleted (see signals).
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,255 @@
+import datetime
+import random
+import statistics
+import threading
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .fragments import bump_events_version
+from .instrumentation import RequestMetrics, percentile
+from .models import RSVP, Event, MatchRegistration, RosterMember, Team, User
+from .rosters import roster_rows
+
+BENCH_PREFIX = 'bench_'
+BENCH_PASSWORD = 'bench'
+BATCH_SIZE = 5000
+
+DEFAULT_VOLUMES = {
+    'users': 50_000,
+    'teams': 2_000,
+    'events': 200_000,
+    'rsvps': 5_000_000,
+    'registrations': 10_000,
+}
+
+
+def batched(iterable, size=BATCH_SIZE):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(model, rows, log=None):
+    # Insert a generator of unsaved instances in fixed-size batches, one transaction each
+    total = 0
+    for batch in batched(rows):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        total += len(batch)
+        if log:
+            log(f"  {model.__name__}: {total}")
+    return total
+
+
+def clear_synthetic():
+    # Everything the generator created hangs off bench_ users and teams
+    Event.objects.filter(title__startswith=BENCH_PREFIX).delete()
+    Team.objects.filter(name__startswith=BENCH_PREFIX).delete()
+    User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+
+
+def seed(volumes, seed=1, log=None):
+    """
+    Create a synthetic esports dataset with bulk_create. Every row is
+    tagged with BENCH_PREFIX so clear_synthetic() can remove it. Memory
+    stays bounded: rows are generated lazily and written in batches.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(BENCH_PASSWORD)
+
+    if log:
+        log("Users")
+    bulk_insert(User, (
+        User(username=f'{BENCH_PREFIX}user{i}', password=password, email=f'{BENCH_PREFIX}user{i}@example.com',
+             role='admin' if i == 0 else 'player')
+        for i in range(volumes['users'])
+    ), log)
+    user_ids = list(User.objects.filter(username__startswith=BENCH_PREFIX).order_by('id').values_list('id', flat=True))
+
+    if log:
+        log("Teams")
+    bulk_insert(Team, (Team(name=f'{BENCH_PREFIX}team{i}') for i in range(volumes['teams'])), log)
+    team_ids = list(Team.objects.filter(name__startswith=BENCH_PREFIX).order_by('id').values_list('id', flat=True))
+
+    if team_ids:
+        # Round-robin rosters: every player on one team
+        Membership = Team.members.through
+        bulk_insert(Membership, (
+            Membership(team_id=team_ids[i % len(team_ids)], user_id=user_id) for i, user_id in enumerate(user_ids)
+        ), log)
+
+    if log:
+        log("Events")
+    span = datetime.timedelta(days=730).total_seconds()
+    event_types = [choice for choice, _ in Event.TYPE_CHOICES]
+
+    def events():
+        for i in range(volumes['events']):
+            start = now - datetime.timedelta(days=365) + datetime.timedelta(seconds=rng.random() * span)
+            yield Event(title=f'{BENCH_PREFIX}event{i}', event_type=rng.choice(event_types), start_time=start,
+                        end_time=start + datetime.timedelta(hours=rng.choice([1, 2, 3])), location='Server 1')
+    bulk_insert(Event, events(), log)
+    # bulk_create skips the signals that invalidate cached month grids
+    bump_events_version()
+    event_ids = list(Event.objects.filter(title__startswith=BENCH_PREFIX).order_by('id').values_list('id', flat=True))
+
+    if team_ids:
+        EventTeam = Event.teams.through
+        bulk_insert(EventTeam, (
+            EventTeam(event_id=event_id, team_id=team_id)
+            for event_id in event_ids
+            for team_id in {rng.choice(team_ids), rng.choice(team_ids)}
+        ), log)
+
+    if log:
+        log("RSVPs")
+    statuses = [choice for choice, _ in RSVP.STATUS_CHOICES]
+
+    def rsvps():
+        if not event_ids or not user_ids:
+            return
+        # Distinct users per event keep (user, event) unique
+        per_event, remainder = divmod(volumes['rsvps'], len(event_ids))
+        for index, event_id in enumerate(event_ids):
+            count = min(per_event + (1 if index < remainder else 0), len(user_ids))
+            for user_id in rng.sample(user_ids, count):
+                yield RSVP(event_id=event_id, user_id=user_id, status=rng.choice(statuses))
+    bulk_insert(RSVP, rsvps(), log)
+
+    if log:
+        log("Match registrations")
+    bulk_insert(MatchRegistration, (
+        MatchRegistration(user_id=user_id, team_name=f'{BENCH_PREFIX}squad{i}', discord_id=f'{BENCH_PREFIX}discord{i}',
+                          members=', '.join(f'player{i}_{n}' for n in range(5)))
+        for i, user_id in enumerate(user_ids[1:volumes['registrations'] + 1])
+    ), log)
+    registrations = MatchRegistration.objects.filter(team_name__startswith=BENCH_PREFIX).only('id', 'members')
+    bulk_insert(RosterMember, (row for registration in registrations.iterator() for row in roster_rows(registration)), log)
+
+
+def bench_users():
+    admin = User.objects.filter(username=f'{BENCH_PREFIX}user0').first()
+    player = User.objects.filter(username__startswith=BENCH_PREFIX, role='player').order_by('id').first()
+    if not admin or not player:
+        raise ValueError("No synthetic data found; run seed_synthetic first.")
+    return admin, player
+
+
+def scenarios():
+    """
+    (name, user role, request builder) for each benchmarked view. Builders
+    take a Client and return the response.
+    """
+    event_id = Event.objects.filter(title__startswith=BENCH_PREFIX, start_time__gte=timezone.now()).values_list('id', flat=True).first()
+    rsvp_url = reverse('calendar_app:rsvp_event', args=[event_id, 'attending'])
+
+    def rsvp(client):
+        return client.post(rsvp_url, HTTP_ACCEPT='application/json')
+
+    return [
+        ('dashboard', 'player', lambda client: client.get(reverse('calendar_app:dashboard'))),
+        ('player_list', 'admin', lambda client: client.get(reverse('calendar_app:player_list'))),
+        ('admin_registrations', 'admin', lambda client: client.get(reverse('calendar_app:admin_registrations'))),
+        ('rsvp_event', 'player', rsvp),
+        ('register_team', 'player', lambda client: client.get(reverse('calendar_app:register_team'))),
+    ]
+
+
+def logged_in_client(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def summarize_timings(timings):
+    return {
+        'requests': len(timings),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'max_ms': round(max(timings), 2),
+    }
+
+
+def run_sequential(repeat, warmup=2):
+    admin, player = bench_users()
+    clients = {'admin': logged_in_client(admin), 'player': logged_in_client(player)}
+    results = {}
+    for name, role, call in scenarios():
+        client = clients[role]
+        for _ in range(warmup):
+            call(client)
+        # Counted with an execute wrapper: DEBUG's queries_log is reset per request
+        metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics.record_query):
+            status = call(client).status_code
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call(client)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = dict(summarize_timings(timings), status=status, queries=metrics.queries, duplicates=metrics.duplicates)
+    return results
+
+
+def run_concurrent(threads, requests_per_thread):
+    """
+    Hammer every scenario from ``threads`` clients at once. Each thread has
+    its own Client and database connection.
+    """
+    admin, player = bench_users()
+    users = {'admin': admin, 'player': player}
+    results = {}
+    for name, role, call in scenarios():
+        timings = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            client = logged_in_client(users[role])
+            local = []
+            try:
+                for _ in range(requests_per_thread):
+                    started = time.perf_counter()
+                    response = call(client)
+                    local.append((time.perf_counter() - started) * 1000)
+                    if response.status_code >= 500:
+                        errors.append(response.status_code)
+            except Exception as exc:
+                errors.append(repr(exc))
+            finally:
+                connections.close_all()
+                with lock:
+                    timings.extend(local)
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        results[name] = dict(summarize_timings(timings) if timings else {'requests': 0},
+                             throughput_rps=round(len(timings) / elapsed, 1), errors=len(errors))
+    return results
+
+
+def row_counts():
+    return {
+        'users': User.objects.count(),
+        'teams': Team.objects.count(),
+        'events': Event.objects.count(),
+        'rsvps': RSVP.objects.count(),
+        'registrations': MatchRegistration.objects.count(),
+    }
@@ -0,0 +1,80 @@
+"""
+Logo derivatives: small square renditions of the uploaded logo in WebP and
+JPEG, generated once when the branding is saved. Names carry a hash of the
+file contents, so they can be cached forever; a new logo gets new names.
+"""
+import hashlib
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+DERIVED_DIR = 'branding/derived'
+# slot -> edge in pixels: the tab icon, the navbar logo (40px at 2x) and the iOS home-screen icon
+SIZES = {
+    'favicon': 32,
+    'header': 80,
+    'touch': 180,
+}
+# format -> (Pillow format, save options, content type)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 85, 'method': 6}, 'image/webp'),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}, 'image/jpeg'),
+}
+# JPEG has no alpha; transparent logos are flattened onto white
+BACKGROUND = (255, 255, 255)
+
+
+def flatten(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, BACKGROUND)
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render(image, size, fmt):
+    pil_format, options, _ = FORMATS[fmt]
+    square = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    square.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(logo, storage=default_storage):
+    """
+    Write every SIZES x FORMATS rendition of the ``logo`` file to
+    ``storage`` and return {slot: {format: storage name}}. Raises
+    PIL.UnidentifiedImageError / OSError for unreadable images.
+    """
+    logo.seek(0)
+    with Image.open(logo) as source:
+        image = flatten(source)
+    variants = {}
+    for slot, size in SIZES.items():
+        variants[slot] = {}
+        for fmt in FORMATS:
+            data = render(image, size, fmt)
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            name = posixpath.join(DERIVED_DIR, f'{slot}-{size}.{digest}.{fmt}')
+            if not storage.exists(name):
+                storage.save(name, ContentFile(data))
+            variants[slot][fmt] = name
+    return variants
+
+
+def delete_variants(variants, keep=None, storage=default_storage):
+    # Remove renditions of a replaced logo, except names still listed in ``keep``
+    kept = {name for formats in (keep or {}).values() for name in formats.values()}
+    for formats in (variants or {}).values():
+        for name in formats.values():
+            if name not in kept:
+                storage.delete(name)
+
+
+def variant_urls(variants, storage=default_storage):
+    return {slot: {fmt: storage.url(name) for fmt, name in formats.items()} for slot, formats in (variants or {}).items()}
@@ -0,0 +1,71 @@
+import calendar
+import datetime
+
+from django.utils import timezone
+
+ONE_DAY = datetime.timedelta(days=1)
+JUST_BEFORE = datetime.timedelta(microseconds=1)
+
+
+def event_days(event, tz=None):
+    """
+    Local dates an event covers. Events without an end_time occupy their
+    start day only; an end exactly at midnight does not spill into that day.
+    """
+    tz = tz or timezone.get_current_timezone()
+    first = event.start_time.astimezone(tz).date()
+    if not event.end_time or event.end_time <= event.start_time:
+        return first, first
+    last = (event.end_time - JUST_BEFORE).astimezone(tz).date()
+    return first, max(first, last)
+
+
+def bucket_by_day(events, window_start, window_end):
+    """
+    Group events by local date in a single pass. Multi-day events are placed
+    on every day they cover, clipped to [window_start, window_end].
+    Returns {date: [event, ...]} preserving the input order per day.
+    """
+    tz = timezone.get_current_timezone()
+    # Aware bounds let events outside the window be skipped without a tz conversion
+    lower = timezone.make_aware(datetime.datetime.combine(window_start, datetime.time.min), tz)
+    upper = timezone.make_aware(datetime.datetime.combine(window_end + ONE_DAY, datetime.time.min), tz)
+
+    buckets = {}
+    for event in events:
+        start = event.start_time
+        if start >= upper:
+            continue
+        if start < lower and (not event.end_time or event.end_time <= lower):
+            continue
+        first, last = event_days(event, tz)
+        day = max(first, window_start)
+        last = min(last, window_end)
+        while day <= last:
+            if day in buckets:
+                buckets[day].append(event)
+            else:
+                buckets[day] = [event]
+            day += ONE_DAY
+    return buckets
+
+
+def month_grid(year, month, events):
+    """
+    Weeks for the month view: a list of weeks, each a list of
+    {'day': int, 'events': [...]} with day 0 for padding cells.
+    """
+    first = datetime.date(year, month, 1)
+    last = datetime.date(year, month, calendar.monthrange(year, month)[1])
+    buckets = bucket_by_day(events, first, last)
+
+    weeks = []
+    for week in calendar.monthcalendar(year, month):
+        week_data = []
+        for day in week:
+            if day == 0:
+                week_data.append({'day': 0, 'events': []})
+            else:
+                week_data.append({'day': day, 'events': buckets.get(datetime.date(year, month, day), [])})
+        weeks.append(week_data)
+    return weeks
@@ -0,0 +1,214 @@
+import datetime
+import heapq
+from collections import defaultdict, namedtuple
+
+from django.db.models import Q
+
+from .ics import DEFAULT_DURATION
+from .models import RSVP, Event, Team, User
+from .recurrence import expand, occurrences_between
+
+# How far ahead a new recurring series is checked for clashes
+CONFLICT_HORIZON = datetime.timedelta(days=180)
+
+Interval = namedtuple('Interval', 'start end event')
+# collect_conflicts() filter meaning "keep every pair"
+ALL_EVENTS = object()
+
+
+class Conflict:
+    """
+    Two overlapping events. ``teams`` holds the teams booked into both;
+    ``players`` the players committed to both through another route
+    (membership of different teams, or an attending RSVP).
+    """
+
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+        self.teams = set()
+        self.players = set()
+
+    @property
+    def kind(self):
+        return 'team' if self.teams else 'player'
+
+
+def interval(event):
+    # Events without an end are assumed to take DEFAULT_DURATION
+    end = event.end_time if event.end_time and event.end_time > event.start_time else event.start_time + DEFAULT_DURATION
+    return Interval(event.start_time, end, event)
+
+
+def overlapping_pairs(intervals):
+    """
+    Every pair of overlapping intervals, using a sweep over start times with
+    a heap of active intervals ordered by end. O(n log n + k) for k pairs.
+    """
+    active = []
+    pairs = []
+    for seq, current in enumerate(sorted(intervals, key=lambda i: (i.start, i.end))):
+        while active and active[0][0] <= current.start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            # Occurrences of one series never clash with each other
+            if other.event.id != current.event.id:
+                pairs.append((other, current))
+        heapq.heappush(active, (current.end, seq, current))
+    return pairs
+
+
+def window_events(window_start, window_end, queryset=None):
+    # One-off events and series occurrences overlapping [window_start, window_end)
+    queryset = Event.objects.all() if queryset is None else queryset
+    one_offs = queryset.filter(
+        Q(start_time__gte=window_start - DEFAULT_DURATION, start_time__lt=window_end)
+        | Q(start_time__lt=window_start, end_time__gt=window_start),
+        recurrence='',
+    ).order_by()
+    events = list(one_offs) + occurrences_between(window_start, window_end, queryset)
+    return [e for e in events if interval(e).end > window_start and e.start_time < window_end]
+
+
+def teams_by_event(event_ids):
+    mapping = defaultdict(set)
+    rows = Event.teams.through.objects.filter(event_id__in=event_ids).values_list('event_id', 'team_id')
+    for event_id, team_id in rows:
+        mapping[event_id].add(team_id)
+    return mapping
+
+
+def members_by_team(team_ids):
+    mapping = defaultdict(set)
+    rows = Team.members.through.objects.filter(team_id__in=team_ids).values_list('team_id', 'user_id')
+    for team_id, user_id in rows:
+        mapping[team_id].add(user_id)
+    return mapping
+
+
+def attending_by_event(event_ids):
+    mapping = defaultdict(set)
+    rows = RSVP.objects.filter(event_id__in=event_ids, status='attending').values_list('event_id', 'user_id')
+    for event_id, user_id in rows:
+        mapping[event_id].add(user_id)
+    return mapping
+
+
+def occurrence_key(iv):
+    return (iv.event.id or 0, iv.start)
+
+
+def collect_conflicts(intervals, event_teams, event_players, involving=ALL_EVENTS):
+    """
+    Group intervals per team and per player, sweep each group, and merge the
+    clashing pairs. With ``involving`` (an event id, None for an unsaved
+    event), only pairs that include that event are kept.
+    """
+    by_team = defaultdict(list)
+    by_player = defaultdict(list)
+    for iv in intervals:
+        for team_id in event_teams.get(iv.event.id, ()):
+            by_team[team_id].append(iv)
+        for user_id in event_players.get(iv.event.id, ()):
+            by_player[user_id].append(iv)
+
+    conflicts = {}
+
+    def record(a, b):
+        if involving is not ALL_EVENTS and involving not in (a.event.id, b.event.id):
+            return None
+        a, b = sorted((a, b), key=occurrence_key)
+        key = (occurrence_key(a), occurrence_key(b))
+        if key not in conflicts:
+            conflicts[key] = Conflict(a.event, b.event)
+        return conflicts[key]
+
+    for team_id, group in by_team.items():
+        for a, b in overlapping_pairs(group):
+            conflict = record(a, b)
+            if conflict:
+                conflict.teams.add(team_id)
+    for user_id, group in by_player.items():
+        for a, b in overlapping_pairs(group):
+            conflict = record(a, b)
+            if conflict and not conflict.teams:
+                conflict.players.add(user_id)
+
+    return sorted(conflicts.values(), key=lambda c: (c.first.start_time, c.second.start_time))
+
+
+def players_by_event(event_ids, event_teams):
+    members = members_by_team({t for teams in event_teams.values() for t in teams})
+    players = attending_by_event(event_ids)
+    for event_id, team_ids in event_teams.items():
+        for team_id in team_ids:
+            players[event_id] |= members[team_id]
+    return players
+
+
+def find_conflicts(window_start, window_end):
+    """
+    All team and player clashes between events in the window, in a
+    constant number of queries.
+    """
+    events = window_events(window_start, window_end)
+    ids = {e.id for e in events}
+    event_teams = teams_by_event(ids)
+    event_players = players_by_event(ids, event_teams)
+    return collect_conflicts([interval(e) for e in events], event_teams, event_players)
+
+
+def conflicts_for(candidate, team_ids):
+    """
+    Clashes between ``candidate`` (saved or not) booked for ``team_ids`` and
+    the existing events of those teams and their players. Recurring
+    candidates are checked for CONFLICT_HORIZON ahead.
+    """
+    team_ids = set(team_ids)
+    if not team_ids:
+        return []
+    if candidate.recurrence:
+        own = expand(candidate, candidate.start_time, candidate.start_time + CONFLICT_HORIZON)
+    else:
+        own = [candidate]
+    if not own:
+        return []
+    own_intervals = [interval(e) for e in own]
+    window_start = min(iv.start for iv in own_intervals)
+    window_end = max(iv.end for iv in own_intervals)
+
+    players = set().union(*members_by_team(team_ids).values())
+    related_teams = team_ids | set(
+        Team.members.through.objects.filter(user_id__in=players).values_list('team_id', flat=True)
+    )
+    related = Event.objects.filter(
+        Q(teams__in=related_teams) | Q(rsvps__user_id__in=players, rsvps__status='attending')
+    ).distinct()
+    if candidate.pk:
+        related = related.exclude(pk=candidate.pk)
+    existing = window_events(window_start, window_end, related)
+
+    ids = {e.id for e in existing}
+    event_teams = teams_by_event(ids)
+    event_players = players_by_event(ids, event_teams)
+    event_teams[candidate.pk] = team_ids
+    event_players[candidate.pk] = players
+    intervals = own_intervals + [interval(e) for e in existing]
+    conflicts = collect_conflicts(intervals, event_teams, event_players, involving=candidate.pk)
+    # Put the candidate first so callers can show the event it clashes with
+    for conflict in conflicts:
+        if conflict.second.id == candidate.pk:
+            conflict.first, conflict.second = conflict.second, conflict.first
+    return conflicts
+
+
+def describe(conflicts):
+    # Resolve team and player ids to names in two queries
+    team_ids = set().union(*(c.teams for c in conflicts)) if conflicts else set()
+    user_ids = set().union(*(c.players for c in conflicts)) if conflicts else set()
+    team_names = dict(Team.objects.filter(id__in=team_ids).values_list('id', 'name'))
+    usernames = dict(User.objects.filter(id__in=user_ids).values_list('id', 'username'))
+    for conflict in conflicts:
+        conflict.team_names = sorted(team_names.get(t, '?') for t in conflict.teams)
+        conflict.player_names = sorted(usernames.get(u, '?') for u in conflict.players)
+    return conflicts
@@ -0,0 +1,5 @@
+from .models import Branding
+
+
+def branding(request):
+    return {'branding': Branding.load()}
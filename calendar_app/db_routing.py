@@ -0,0 +1,76 @@
+import contextvars
+import functools
+import inspect
+
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+# After a write, the client reads from the primary for this long so a
+# redirect back to the dashboard never shows replica lag
+PIN_COOKIE = 'db_primary_pin'
+PIN_SECONDS = 10
+
+use_replica = contextvars.ContextVar('calendar_app_use_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def read_from_replica(view):
+    """
+    Route the ORM reads made inside ``view`` to the replica. Put it under
+    @login_required so the session and user are still loaded from the
+    primary. Writes always go to the primary. Works on async views too:
+    the flag is a context variable, which sync_to_async carries into the
+    threads the async ORM runs in.
+    """
+    def primary_only(request):
+        return request.method not in ('GET', 'HEAD') or PIN_COOKIE in request.COOKIES
+
+    if inspect.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if primary_only(request):
+                return await view(request, *args, **kwargs)
+            token = use_replica.set(True)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                use_replica.reset(token)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if primary_only(request):
+            return view(request, *args, **kwargs)
+        token = use_replica.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            use_replica.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Primary/replica router. Reads go to the replica only inside a
+    @read_from_replica view and only when settings.DATABASES has a
+    'replica' alias; everything else uses default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if use_replica.get() and replica_configured():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
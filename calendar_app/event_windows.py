@@ -0,0 +1,93 @@
+import calendar
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Event
+from .recurrence import merge_upcoming, occurrences_between, series_overlapping
+
+UPCOMING_PAGE_SIZE = 12
+
+
+def month_bounds(year, month):
+    # [start, end) of the month in the current timezone, as aware datetimes
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.datetime(year, month, 1), tz)
+    days = calendar.monthrange(year, month)[1]
+    end = timezone.make_aware(datetime.datetime(year, month, days) + datetime.timedelta(days=1), tz)
+    return start, end
+
+
+def month_events(year, month, queryset=None):
+    # One-off events starting in the month, plus multi-day events carried in
+    # from before it. Left unordered so the planner can serve each branch
+    # from its own index; callers sort the (small) result with sort_events().
+    start, end = month_bounds(year, month)
+    queryset = Event.objects.all() if queryset is None else queryset
+    return queryset.filter(
+        Q(start_time__gte=start, start_time__lt=end) | Q(start_time__lt=start, end_time__gt=start),
+        recurrence='',
+    ).order_by()
+
+
+def month_grid_events(year, month, queryset=None):
+    # One-off events plus the occurrences of recurring series in the month, sorted
+    start, end = month_bounds(year, month)
+    return sort_events(list(month_events(year, month, queryset)) + occurrences_between(start, end, queryset))
+
+
+def sort_events(events):
+    return sorted(events, key=lambda e: (e.start_time, e.id))
+
+
+def encode_cursor(event):
+    return f"{event.start_time.isoformat()}_{event.id}"
+
+
+def decode_cursor(cursor):
+    # Returns (start_time, id) or None for a missing/garbled cursor
+    if not cursor:
+        return None
+    try:
+        start, pk = cursor.rsplit('_', 1)
+        start_time = datetime.datetime.fromisoformat(start)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if timezone.is_naive(start_time):
+        start_time = timezone.make_aware(start_time)
+    return start_time, pk
+
+
+def upcoming_queryset(now=None, cursor=None, queryset=None):
+    # One-off events at or after ``now``, positioned after ``cursor`` in (start_time, id) order
+    qs = (Event.objects.all() if queryset is None else queryset).filter(start_time__gte=now or timezone.now(), recurrence='')
+    position = decode_cursor(cursor)
+    if position:
+        start_time, pk = position
+        qs = qs.filter(Q(start_time__gt=start_time) | Q(start_time=start_time, id__gt=pk))
+    return qs.order_by('start_time', 'id')
+
+
+def upcoming_events(now=None, cursor=None, limit=UPCOMING_PAGE_SIZE, queryset=None):
+    """
+    One page of events starting at or after ``now``, keyset-paginated on
+    (start_time, id). Recurring series contribute only the occurrences that
+    fall on the page. ``queryset`` narrows the events considered. Returns
+    (events, next_cursor); next_cursor is None on the last page.
+    """
+    now = now or timezone.now()
+    # Fetch one extra row to know whether another page exists
+    events = list(upcoming_queryset(now, cursor, queryset)[:limit + 1])
+
+    after, after_id = decode_cursor(cursor) or (now, None)
+    if after < now:
+        after, after_id = now, None
+    series = series_overlapping(after, queryset=queryset)
+    events = merge_upcoming(events, series, after, after_id, limit)
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1])
+    return events, next_cursor
@@ -0,0 +1,173 @@
+"""
+Streaming CSV and XLSX exports. Rows come from values_list().iterator(),
+so memory stays flat and the first bytes go out before the query is
+exhausted, whatever the row count.
+"""
+import csv
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import RSVP, MatchRegistration
+
+CHUNK_SIZE = 2000
+# Bytes buffered before an XLSX chunk is sent
+XLSX_FLUSH_BYTES = 64 * 1024
+# Leading characters that make spreadsheets evaluate a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Control characters XML 1.0 cannot carry
+XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# (values_list path, column header)
+REGISTRATION_COLUMNS = [
+    ('id', 'ID'),
+    ('team_name', 'Team'),
+    ('discord_id', 'Discord ID'),
+    ('members', 'Members'),
+    ('user__username', 'Registered by'),
+    ('created_at', 'Registered at'),
+]
+ATTENDANCE_COLUMNS = [
+    ('event_id', 'Event ID'),
+    ('event__title', 'Event'),
+    ('event__start_time', 'Starts'),
+    ('user__username', 'Player'),
+    ('user__email', 'Email'),
+    ('status', 'Status'),
+    ('updated_at', 'Updated'),
+]
+
+
+def registration_rows():
+    # Primary-key order streams straight off the table, no sort step
+    fields = [field for field, _ in REGISTRATION_COLUMNS]
+    return MatchRegistration.objects.order_by('id').values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def attendance_rows(event_id=None, status=None):
+    fields = [field for field, _ in ATTENDANCE_COLUMNS]
+    qs = RSVP.objects.order_by('id')
+    if event_id:
+        qs = qs.filter(event_id=event_id)
+    if status:
+        qs = qs.filter(status=status)
+    return qs.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+    return value
+
+
+class Echo:
+    # csv.writer target that hands each formatted line straight back
+    def write(self, value):
+        return value
+
+
+def csv_stream(columns, rows):
+    writer = csv.writer(Echo())
+    # BOM so Excel opens UTF-8 team names correctly
+    yield '\ufeff' + writer.writerow([header for _, header in columns])
+    for row in rows:
+        values = [cell(value) for value in row]
+        yield writer.writerow([
+            "'" + value if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+            for value in values
+        ])
+
+
+class ZipSink:
+    # Write-only, unseekable file for ZipFile; drain() hands back what was written
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def xlsx_cell(value):
+    value = cell(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(XML_ILLEGAL_RE.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(values):
+    return '<row>' + ''.join(xlsx_cell(value) for value in values) + '</row>'
+
+
+def xlsx_stream(columns, rows, sheet_name='Export'):
+    """
+    A single-sheet XLSX workbook generated on the fly: the static parts,
+    then the worksheet deflated row by row into a zip written to an
+    unseekable sink. Cells are inline strings and numbers, no styles.
+    """
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, body in XLSX_PARTS.items():
+            archive.writestr(name, body)
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        yield sink.drain()
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + xlsx_row([header for _, header in columns])
+            ).encode())
+            for row in rows:
+                sheet.write(xlsx_row(row).encode())
+                if sink.size >= XLSX_FLUSH_BYTES:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    # Rest of the worksheet and the central directory
+    yield sink.drain()
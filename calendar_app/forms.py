@@ -1,6 +1,11 @@
+import datetime
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from .models import User, Event, Branding, MatchRegistration
+from .branding_images import delete_variants, generate_variants
+from .importer import detect_format
+from .recurrence import check_rule
 
 class SignUpForm(UserCreationForm):
     class Meta:
@@ -12,12 +17,61 @@ class LoginForm(forms.Form):
     password = forms.CharField(widget=forms.PasswordInput)
 
 class EventForm(forms.ModelForm):
+    recurrence_exceptions = forms.CharField(
+        required=False,
+        label='Skip Dates',
+        help_text='Comma-separated dates (YYYY-MM-DD) to leave out of a repeating event',
+    )
+
     class Meta:
         model = Event
-        fields = ['title', 'event_type', 'start_time', 'location']
+        fields = ['title', 'event_type', 'start_time', 'end_time', 'location', 'teams', 'recurrence', 'recurrence_exceptions']
         widgets = {
             'start_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'end_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
+            'teams': forms.CheckboxSelectMultiple,
+            'recurrence': forms.TextInput(attrs={'placeholder': 'FREQ=WEEKLY;BYDAY=TU,TH'}),
         }
+        labels = {
+            'recurrence': 'Repeat Rule',
+        }
+
+    def clean_recurrence_exceptions(self):
+        value = self.cleaned_data.get('recurrence_exceptions') or ''
+        dates = []
+        for part in value.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                dates.append(datetime.date.fromisoformat(part).isoformat())
+            except ValueError:
+                raise forms.ValidationError(f"'{part}' is not a YYYY-MM-DD date.")
+        return dates
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        if start_time and end_time and end_time <= start_time:
+            self.add_error('end_time', "End time must be after the start time.")
+        recurrence = cleaned_data.get('recurrence')
+        if recurrence and start_time:
+            try:
+                check_rule(recurrence, start_time)
+            except (ValueError, TypeError) as exc:
+                self.add_error('recurrence', f"Invalid repeat rule: {exc}")
+        return cleaned_data
+
+class EventImportForm(forms.Form):
+    file = forms.FileField(help_text='CSV with a header row, or an iCalendar (.ics) file')
+    skip_invalid = forms.BooleanField(required=False, label='Import valid rows even if some are rejected')
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if detect_format(upload.name) is None:
+            raise forms.ValidationError("Upload a .csv or .ics file.")
+        return upload
 
 class BrandingForm(forms.ModelForm):
     class Meta:
@@ -30,6 +84,16 @@ class BrandingForm(forms.ModelForm):
             'registration_open': 'Team Registration Open',
         }
 
+    def save(self, commit=True):
+        # Renditions are made once here (ImageField has already checked the
+        # upload is an image), so pages never serve the full-size logo
+        if 'logo' in self.changed_data:
+            previous = self.instance.logo_variants
+            logo = self.cleaned_data.get('logo')
+            self.instance.logo_variants = generate_variants(logo) if logo else {}
+            delete_variants(previous, keep=self.instance.logo_variants)
+        return super().save(commit)
+
 class MatchRegistrationForm(forms.ModelForm):
     class Meta:
         model = MatchRegistration
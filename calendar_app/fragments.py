@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .calendar_engine import month_grid
+from .event_windows import month_grid_events
+from .models import Event
+from .team_scope import for_teams, scope_key
+
+EVENTS_VERSION_KEY = 'calendar_app:events:version'
+# The per-process locmem cache (no REDIS_URL) never sees a version bump made
+# in another process, such as `manage.py import_events` or a second worker,
+# so there a grid is only trusted for a few minutes
+GRID_CACHE_TIMEOUT = 60 * 60 * 24 if settings.REDIS_URL else 60 * 5
+
+
+def events_version():
+    """
+    Version of the event set, part of every grid fragment key. Seeded from
+    the clock so a version lost to eviction never repeats an older one.
+    """
+    version = cache.get(EVENTS_VERSION_KEY)
+    if version is None:
+        cache.add(EVENTS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(EVENTS_VERSION_KEY)
+    return version
+
+
+def bump_events_version():
+    # Called from Event signals; bulk writes that skip signals must call it too
+    try:
+        cache.incr(EVENTS_VERSION_KEY)
+    except ValueError:
+        cache.set(EVENTS_VERSION_KEY, time.time_ns(), None)
+
+
+def month_grid_fragment(year, month, team_ids=None):
+    """
+    Rendered month grid HTML and the ids of the events in it, cached per
+    (year, month, team scope, events version). The fragment holds no
+    per-user state, so every user with the same teams shares it; RSVP
+    status is overlaid by the page. ``team_ids`` None means every event.
+    """
+    # Read the version before querying so a concurrent edit leaves us under a stale key
+    key = f'calendar_app:grid:{events_version()}:{scope_key(team_ids)}:{year}:{month}'
+    cached = cache.get(key)
+    if cached is None:
+        events = month_grid_events(year, month, for_teams(Event.objects.all(), team_ids))
+        html = render_to_string('calendar_app/month_grid.html', {'calendar_weeks': month_grid(year, month, events)})
+        cached = (str(html), sorted({e.id for e in events}))
+        cache.set(key, cached, GRID_CACHE_TIMEOUT)
+    html, event_ids = cached
+    return mark_safe(html), event_ids
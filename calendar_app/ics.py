@@ -0,0 +1,107 @@
+import datetime
+
+from django.core import signing
+from django.db.models import F
+
+from .models import User
+
+DEFAULT_DURATION = datetime.timedelta(hours=1)
+FEED_SALT = 'calendar_app.feeds'
+PRODID = '-//VOYAA//Esports Calendar//EN'
+UID_DOMAIN = 'voyaa'
+
+
+def feed_token(user):
+    # Stateless per-user token; calendar clients cannot send a session cookie.
+    # Valid until the user's feed_token_version is bumped (rotate_feed_token).
+    return signing.Signer(salt=FEED_SALT).sign(f'{user.pk}.{user.feed_token_version}')
+
+
+def user_from_feed_token(token):
+    try:
+        user_id, _, version = signing.Signer(salt=FEED_SALT).unsign(token).partition('.')
+        # Tokens issued before versioning carry only the id and count as version 0
+        user_id, version = int(user_id), int(version or 0)
+    except (signing.BadSignature, ValueError):
+        return None
+    return User.objects.filter(pk=user_id, feed_token_version=version, is_active=True).first()
+
+
+def rotate_feed_token(user):
+    # Revokes every feed URL issued to ``user`` so far; saving also drops the cached user
+    user.feed_token_version = F('feed_token_version') + 1
+    user.save(update_fields=['feed_token_version'])
+    user.refresh_from_db(fields=['feed_token_version'])
+    return feed_token(user)
+
+
+def escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    # RFC 5545: content lines longer than 75 octets continue with a leading space
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, limit = [], 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Do not split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_dt(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def uid(event):
+    if getattr(event, 'series', None):
+        # Each expanded occurrence of a series is its own VEVENT
+        return f'event-{event.id}-{format_dt(event.start_time)}@{UID_DOMAIN}'
+    return f'event-{event.id}@{UID_DOMAIN}'
+
+
+def vevent(event):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid(event)}',
+        f'DTSTAMP:{format_dt(event.created_at)}',
+        f'DTSTART:{format_dt(event.start_time)}',
+        f'DTEND:{format_dt(event.end_time or event.start_time + DEFAULT_DURATION)}',
+        f'SUMMARY:{escape(event.title)}',
+        f'CATEGORIES:{escape(event.get_event_type_display())}',
+    ]
+    if event.location:
+        lines.append(f'LOCATION:{escape(event.location)}')
+    status = getattr(event, 'user_status', None)
+    if status:
+        lines.append(f'DESCRIPTION:{escape("Your RSVP: " + status.title())}')
+        if status == 'unavailable':
+            lines.append('TRANSP:TRANSPARENT')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def calendar_stream(events, name):
+    """
+    Yield an iCalendar document piece by piece: the header, one chunk per
+    VEVENT, then the footer. ``events`` may be a lazy iterator.
+    """
+    yield ''.join(fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(name)}',
+    ])
+    for event in events:
+        yield vevent(event)
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,255 @@
+"""
+Bulk event import from CSV or iCalendar, shared by the import_events
+command and the admin upload page.
+
+CSV needs a header row; ``title`` and ``start_time`` are required, the
+other columns (event_type, end_time, location, teams, recurrence,
+recurrence_exceptions) are optional. ``teams`` and
+``recurrence_exceptions`` hold several values separated by ``;``. Times are
+ISO 8601; naive values are in the site time zone.
+
+ICS files are read VEVENT by VEVENT: SUMMARY, DTSTART, DTEND, LOCATION,
+CATEGORIES (the event type), RRULE and EXDATE. Team assignments are not
+part of iCalendar, so ICS imports create events without teams.
+"""
+import csv
+import datetime
+import zoneinfo
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .fragments import bump_events_version
+from .models import Event, Team
+from .recurrence import check_rule, series_until
+
+BATCH_SIZE = 1000
+FORMATS = ('csv', 'ics')
+CSV_COLUMNS = ('title', 'event_type', 'start_time', 'end_time', 'location', 'teams',
+               'recurrence', 'recurrence_exceptions')
+EVENT_TYPES = {value: value for value, _ in Event.TYPE_CHOICES}
+EVENT_TYPES.update({label.lower(): value for value, label in Event.TYPE_CHOICES})
+DEFAULT_EVENT_TYPE = 'match'
+
+
+class ImportReport:
+    """
+    Outcome of one import: ``errors`` is a list of (line, message) for
+    rows that were rejected; ``created`` counts the events written.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower()
+    return extension if extension in FORMATS else None
+
+
+def csv_records(lines):
+    reader = csv.DictReader(lines)
+    missing = {'title', 'start_time'} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing CSV column(s): {', '.join(sorted(missing))}")
+    for record in reader:
+        record = {key.strip(): (value or '').strip() for key, value in record.items() if key}
+        record['teams'] = split_list(record.get('teams', ''))
+        record['recurrence_exceptions'] = split_list(record.get('recurrence_exceptions', ''))
+        yield reader.line_num, record
+
+
+def split_list(value):
+    return [part.strip() for part in value.split(';') if part.strip()]
+
+
+def unfold(lines):
+    # RFC 5545 content lines, with continuation lines joined back on; yields (line number, line)
+    number, current = 0, None
+    for index, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield number, current
+        number, current = index, line
+    if current:
+        yield number, current
+
+
+def unescape(text):
+    return (text.replace('\\n', '\n').replace('\\N', '\n').replace('\\,', ',')
+            .replace('\\;', ';').replace('\\\\', '\\'))
+
+
+def ics_datetime(value, params):
+    # DATE, UTC ("...Z"), TZID-qualified or floating local DATE-TIME
+    value = value.strip()
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        day = datetime.datetime.strptime(value, '%Y%m%d')
+        return timezone.make_aware(day)
+    if value.endswith('Z'):
+        return datetime.datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=datetime.timezone.utc)
+    naive = datetime.datetime.strptime(value, '%Y%m%dT%H%M%S')
+    if 'TZID' in params:
+        try:
+            return naive.replace(tzinfo=zoneinfo.ZoneInfo(params['TZID']))
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone '{params['TZID']}'")
+    return timezone.make_aware(naive)
+
+
+def ics_records(lines):
+    record = None
+    for number, line in unfold(lines):
+        name, _, value = line.partition(':')
+        name, *raw_params = name.split(';')
+        name = name.upper()
+        params = dict(p.split('=', 1) for p in raw_params if '=' in p)
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            record, start_line = {'teams': [], 'recurrence_exceptions': []}, number
+        elif record is None:
+            continue
+        elif name == 'END' and value.upper() == 'VEVENT':
+            yield start_line, record
+            record = None
+        else:
+            try:
+                if name == 'SUMMARY':
+                    record['title'] = unescape(value)
+                elif name == 'LOCATION':
+                    record['location'] = unescape(value)
+                elif name == 'CATEGORIES':
+                    record['event_type'] = unescape(value).split(',')[0].strip()
+                elif name in ('DTSTART', 'DTEND'):
+                    record['start_time' if name == 'DTSTART' else 'end_time'] = ics_datetime(value, params)
+                elif name == 'RRULE':
+                    record['recurrence'] = value
+                elif name == 'EXDATE':
+                    record['recurrence_exceptions'] += [
+                        timezone.localtime(ics_datetime(part, params)).date().isoformat()
+                        for part in value.split(',')
+                    ]
+            except ValueError:
+                record.setdefault('error', f"Invalid {name} value '{value}'")
+
+
+def parse_time(value, column):
+    if isinstance(value, datetime.datetime) or not value:
+        return value or None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        parsed = datetime.datetime.combine(day, datetime.time()) if day else None
+    if parsed is None:
+        raise ValueError(f"{column} '{value}' is not an ISO 8601 date/time")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def build_event(record, team_ids):
+    """
+    An unsaved Event and its team ids from one parsed record, applying the
+    same checks as EventForm. Raises ValueError with a readable message.
+    """
+    if record.get('error'):
+        raise ValueError(record['error'])
+    title = record.get('title', '')
+    if not title:
+        raise ValueError("title is required")
+    start_time = parse_time(record.get('start_time'), 'start_time')
+    if start_time is None:
+        raise ValueError("start_time is required")
+    end_time = parse_time(record.get('end_time'), 'end_time')
+    if end_time and end_time <= start_time:
+        raise ValueError("end_time must be after start_time")
+    event_type = EVENT_TYPES.get((record.get('event_type') or DEFAULT_EVENT_TYPE).lower())
+    if event_type is None:
+        raise ValueError(f"Unknown event_type '{record['event_type']}'")
+
+    event = Event(title=title, event_type=event_type, start_time=start_time, end_time=end_time,
+                  location=record.get('location', ''), recurrence=record.get('recurrence', ''))
+    for field in ('title', 'location', 'recurrence'):
+        limit = Event._meta.get_field(field).max_length
+        if len(getattr(event, field)) > limit:
+            raise ValueError(f"{field} is longer than {limit} characters")
+    exceptions = []
+    for day in record.get('recurrence_exceptions', []):
+        try:
+            exceptions.append(datetime.date.fromisoformat(day).isoformat())
+        except ValueError:
+            raise ValueError(f"'{day}' is not a YYYY-MM-DD date")
+    event.recurrence_exceptions = exceptions
+    if event.recurrence:
+        try:
+            check_rule(event.recurrence, start_time)
+            # bulk_create bypasses Event.save(), which normally fills this in
+            event.recurrence_until = series_until(event)
+        except (ValueError, TypeError) as exc:
+            raise ValueError(f"Invalid repeat rule: {exc}")
+
+    unknown = [name for name in record.get('teams', []) if name not in team_ids]
+    if unknown:
+        raise ValueError(f"Unknown team(s): {', '.join(unknown)}")
+    ambiguous = [name for name in record.get('teams', []) if team_ids[name] is None]
+    if ambiguous:
+        raise ValueError(f"Several teams are named {', '.join(ambiguous)}")
+    return event, sorted({team_ids[name] for name in record.get('teams', [])})
+
+
+def team_lookup(records):
+    # {name: team id} for every team named in ``records`` in one query; None marks a duplicated name
+    names = {name for _, record in records for name in record.get('teams', [])}
+    team_ids = {}
+    for team_id, name in Team.objects.filter(name__in=names).values_list('id', 'name'):
+        team_ids[name] = None if name in team_ids else team_id
+    return team_ids
+
+
+def import_events(lines, fmt, skip_invalid=False, dry_run=False):
+    """
+    Validate every record of a CSV or ICS file and insert the valid ones
+    with batched bulk_create calls, event-team links included, in one
+    transaction. Nothing is written when any record is invalid, unless
+    ``skip_invalid`` is set. ``lines`` is an iterable of text lines.
+    Returns an ImportReport.
+    """
+    report = ImportReport()
+    records = list(csv_records(lines) if fmt == 'csv' else ics_records(lines))
+    report.rows = len(records)
+    team_ids = team_lookup(records)
+
+    events, event_teams = [], []
+    for line, record in records:
+        try:
+            event, teams = build_event(record, team_ids)
+        except ValueError as exc:
+            report.errors.append((line, str(exc)))
+            continue
+        events.append(event)
+        event_teams.append(teams)
+
+    if dry_run or not events or (report.errors and not skip_invalid):
+        return report
+
+    EventTeam = Event.teams.through
+    with transaction.atomic():
+        # Primary keys come back from the INSERT (RETURNING on SQLite 3.35+ and PostgreSQL)
+        Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+        EventTeam.objects.bulk_create(
+            [EventTeam(event_id=event.pk, team_id=team_id)
+             for event, teams in zip(events, event_teams) for team_id in teams],
+            batch_size=BATCH_SIZE,
+        )
+        # bulk_create skips the signals that invalidate cached month grids
+        bump_events_version()
+        transaction.on_commit(bump_events_version)
+    report.created = len(events)
+    return report
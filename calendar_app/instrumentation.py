@@ -0,0 +1,162 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+
+from django.template.base import Template
+
+# Samples kept per URL name for the rolling percentiles
+SAMPLE_WINDOW = 1000
+# Requests between writes of this process's samples to PERF_SAMPLES_DIR
+FLUSH_EVERY = 25
+SAMPLE_FIELDS = ('wall_ms', 'db_ms', 'queries', 'duplicates', 'template_ms')
+
+current_metrics = contextvars.ContextVar('calendar_app_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.sql_counts = Counter()
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.sql_counts[sql] += 1
+
+    @property
+    def queries(self):
+        return sum(self.sql_counts.values())
+
+    @property
+    def duplicates(self):
+        # Repeats of an identical parametrized statement: the N+1 signature
+        return sum(n - 1 for n in self.sql_counts.values() if n > 1)
+
+    def worst_duplicate(self):
+        sql, n = max(self.sql_counts.items(), key=lambda item: item[1], default=('', 0))
+        return (sql, n) if n > 1 else None
+
+    def sample(self):
+        return (
+            round((time.perf_counter() - self.started) * 1000, 2),
+            round(self.db_time * 1000, 2),
+            self.queries,
+            self.duplicates,
+            round(self.template_time * 1000, 2),
+        )
+
+
+def server_timing(metrics, wall_ms):
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'dup;desc="{metrics.duplicates} duplicate queries"',
+        f'tpl;dur={metrics.template_time * 1000:.1f}',
+        f'total;dur={wall_ms:.1f}',
+    ])
+
+
+def timed_template_render(render):
+    # Only the outermost render is timed; extends/include nest inside it
+    def wrapper(self, context):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return render(self, context)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if metrics.template_depth == 0:
+                metrics.template_time += time.perf_counter() - started
+    wrapper.timed = True
+    return wrapper
+
+
+def install_template_timer():
+    if not getattr(Template.render, 'timed', False):
+        Template.render = timed_template_render(Template.render)
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of a non-empty sequence
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class PerfStats:
+    """
+    Rolling per-URL-name samples for this process. Samples are written to
+    ``<directory>/<pid>.json`` every FLUSH_EVERY requests so the
+    perf_report command can merge every worker's view.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+        self.duplicates = {}
+        self.pending = 0
+        self.lock = threading.RLock()
+
+    def add(self, url_name, sample, worst_duplicate=None):
+        with self.lock:
+            self.samples[url_name].append(sample)
+            if worst_duplicate:
+                self.duplicates[url_name] = worst_duplicate
+            self.pending += 1
+            if self.pending >= FLUSH_EVERY:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.pending = 0
+            data = {
+                'samples': {name: list(values) for name, values in self.samples.items()},
+                'duplicates': self.duplicates,
+            }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{os.getpid()}.json'
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+
+
+def load_samples(directory):
+    # Merge every worker's sample file: {url_name: [sample, ...]}, {url_name: (sql, n)}
+    samples = defaultdict(list)
+    duplicates = {}
+    for path in sorted(Path(directory).glob('*.json')):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, values in data.get('samples', {}).items():
+            samples[name].extend(values)
+        for name, (sql, n) in data.get('duplicates', {}).items():
+            if n > duplicates.get(name, ('', 0))[1]:
+                duplicates[name] = (sql, n)
+    return samples, duplicates
+
+
+def summarize(samples):
+    summary = {}
+    for name, values in samples.items():
+        columns = dict(zip(SAMPLE_FIELDS, zip(*values)))
+        summary[name] = {'requests': len(values)}
+        for field in ('wall_ms', 'db_ms', 'queries'):
+            for pct in (50, 95, 99):
+                summary[name][f'{field}_p{pct}'] = percentile(columns[field], pct)
+        summary[name]['duplicates_max'] = max(columns['duplicates'])
+        summary[name]['template_ms_p95'] = percentile(columns['template_ms'], 95)
+    return summary
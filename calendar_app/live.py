@@ -0,0 +1,205 @@
+"""
+Live RSVP and registration updates over Server-Sent Events.
+
+    GET /live/    text/event-stream; events "rsvp", "registration", "resync"
+
+Writes publish small JSON deltas to an in-process Broadcast once their
+transaction commits; every open stream is a subscriber with its own
+bounded queue. Streams end after STREAM_SECONDS and the browser
+reconnects with Last-Event-ID, replaying what it missed from the recent
+buffer, or gets "resync" (reload your data) when that is not possible.
+
+The broadcast lives in one process, so run a single ASGI worker or
+replace Broadcast with a shared pub/sub. Streaming needs ASGI; under WSGI
+the endpoint answers 204, which tells EventSource not to reconnect.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+from collections import deque
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .team_scope import is_admin
+
+REPLAY_SIZE = 500
+QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 15
+# Bounded streams re-check the session and spread reconnects out
+STREAM_SECONDS = 300
+RETRY_MS = 3000
+
+
+class Message:
+    def __init__(self, id, kind, data, users, admins):
+        self.id = id
+        self.kind = kind
+        self.data = data
+        self.users = users
+        self.admins = admins
+
+    def encode(self):
+        payload = json.dumps(self.data, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return f"id: {self.id}\nevent: {self.kind}\ndata: {payload}\n\n"
+
+
+class Subscriber:
+    def __init__(self, user_id, admin, loop):
+        self.user_id = user_id
+        self.admin = admin
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, message):
+        return (message.admins and self.admin) or self.user_id in message.users
+
+    def push(self, message):
+        # Runs on the subscriber's event loop; a stalled client loses messages and resyncs
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broadcast:
+    """
+    Thread-safe fan-out from (sync) publishers to (async) subscribers.
+    Message ids are "<epoch>:<n>"; the epoch changes with every process,
+    so a Last-Event-ID from before a restart is recognised as a gap.
+    """
+
+    def __init__(self, replay_size=REPLAY_SIZE):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+        self.last = 0
+        self.recent = deque(maxlen=replay_size)
+        self.subscribers = set()
+
+    def publish(self, kind, data, users=(), admins=True):
+        """
+        Send ``data`` (or the result of calling it, so nothing is computed
+        when nobody listens) to admins and/or the given user ids.
+        """
+        skipped = False
+        if callable(data):
+            with self.lock:
+                skipped = not self.subscribers
+            # Computed outside the lock, since it may query the database
+            data = None if skipped else data()
+        with self.lock:
+            self.last = next(self.counter)
+            if skipped or not self.subscribers:
+                # Nobody to tell (a stream opened since the skip gets the gap);
+                # anyone resuming from before this id must resync
+                self.recent.clear()
+                return
+            subscribers = list(self.subscribers)
+            # Numbered and appended together so ``recent`` stays in id order for replay
+            message = Message(f'{self.epoch}:{self.last}', kind, data, frozenset(users), admins)
+            self.recent.append(message)
+        for subscriber in subscribers:
+            if subscriber.wants(message):
+                subscriber.loop.call_soon_threadsafe(subscriber.push, message)
+
+    def subscribe(self, user_id, admin, last_event_id=None):
+        """
+        A new Subscriber and the messages it missed since
+        ``last_event_id``; the backlog is None when they cannot be replayed.
+        """
+        subscriber = Subscriber(user_id, admin, asyncio.get_running_loop())
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if not last_event_id:
+                return subscriber, []
+            epoch, _, seen = last_event_id.partition(':')
+            if epoch != self.epoch or not seen.isdigit() or int(seen) > self.last:
+                return subscriber, None
+            seen = int(seen)
+            if seen == self.last:
+                return subscriber, []
+            replay = [m for m in self.recent if int(m.id.partition(':')[2]) > seen]
+            # The buffer must reach back to the first message after ``seen``
+            if not replay or int(replay[0].id.partition(':')[2]) != seen + 1:
+                return subscriber, None
+        return subscriber, [m for m in replay if subscriber.wants(m)]
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+
+broadcast = Broadcast()
+
+
+def publish_rsvps(user_id, statuses, using=None):
+    """
+    Announce {event_id: status or None} changes by ``user_id`` after the
+    transaction on ``using`` commits. The user's own other tabs get the
+    statuses; admins also get fresh per-status counts for those events.
+    """
+    from .aggregates import rsvp_counts
+
+    event_ids = list(statuses)
+    statuses = {str(event_id): status for event_id, status in statuses.items()}
+
+    def send():
+        broadcast.publish('rsvp', {'user': user_id, 'statuses': statuses}, users=[user_id], admins=False)
+        broadcast.publish('rsvp', lambda: {
+            'user': user_id,
+            'statuses': statuses,
+            'counts': {str(event_id): counts for event_id, counts in rsvp_counts(event_ids).items()},
+        })
+    transaction.on_commit(send, using=using)
+
+
+def publish_registration(registration, deleted=False):
+    data = {'id': registration.pk, 'deleted': deleted}
+    if not deleted:
+        data.update(team_name=registration.team_name, discord_id=registration.discord_id,
+                    members=registration.members, created_at=registration.created_at)
+    transaction.on_commit(lambda: broadcast.publish('registration', data))
+
+
+async def event_stream(subscriber, backlog):
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if backlog is None:
+            yield "event: resync\ndata: {}\n\n"
+        for message in backlog or ():
+            yield message.encode()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_SECONDS
+        while loop.time() < deadline:
+            if subscriber.overflowed:
+                subscriber.overflowed = False
+                yield "event: resync\ndata: {}\n\n"
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+                continue
+            yield message.encode()
+    finally:
+        broadcast.unsubscribe(subscriber)
+
+
+async def updates(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    subscriber, backlog = broadcast.subscribe(user.pk, is_admin(user), request.headers.get('Last-Event-ID'))
+    response = StreamingHttpResponse(event_stream(subscriber, backlog), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx-style proxies not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from calendar_app.api import api_token
+from calendar_app.models import User
+
+
+class Command(BaseCommand):
+    help = "Print a user's JSON API token (send it as 'Authorization: Bearer <token>')."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--revoke', action='store_true',
+                            help="Invalidate every token issued to the user so far, then print a new one.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}.")
+        if options['revoke']:
+            User.objects.filter(pk=user.pk).update(api_token_version=F('api_token_version') + 1)
+            user.refresh_from_db(fields=['api_token_version'])
+        self.stdout.write(api_token(user))
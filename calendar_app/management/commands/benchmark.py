@@ -0,0 +1,94 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from calendar_app.benchmarking import row_counts, run_concurrent, run_sequential
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ("Time dashboard, player_list, admin_registrations, rsvp_event and register_team "
+            "through the test Client against seed_synthetic data, and write the results as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per view (default 20).")
+        parser.add_argument('--concurrency', type=int, default=0,
+                            help="Also run a concurrent load pass with this many client threads.")
+        parser.add_argument('--requests-per-thread', type=int, default=10)
+        parser.add_argument('--output', help="Write the JSON results to this file.")
+        parser.add_argument('--compare', help="A previous --output file to diff p95 latency and query counts against.")
+
+    def handle(self, *args, **options):
+        # The test Client talks to the 'testserver' host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            try:
+                results = {'sequential': run_sequential(options['repeat'])}
+                if options['concurrency']:
+                    results['concurrent'] = run_concurrent(options['concurrency'], options['requests_per_thread'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        report = {
+            'timestamp': timezone.now().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'session_engine': settings.SESSION_ENGINE,
+            'auth_backends': settings.AUTHENTICATION_BACKENDS,
+            'rows': row_counts(),
+            'repeat': options['repeat'],
+            'results': results,
+        }
+
+        header = f"{'view':<22} {'status':>6} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, row in results['sequential'].items():
+            self.stdout.write(
+                f"{name:<22} {row['status']:>6} {row['queries']:>8} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['max_ms']:>8.1f}"
+            )
+        for name, row in results.get('concurrent', {}).items():
+            self.stdout.write(
+                f"concurrent {name:<22} {row.get('throughput_rps', 0):>8} req/s  p95 {row.get('p95_ms', 0):.1f} ms  errors {row['errors']}"
+            )
+
+        if options['compare']:
+            self.compare(options['compare'], results['sequential'])
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def compare(self, path, current):
+        try:
+            with open(path) as fh:
+                baseline = json.load(fh)['results']['sequential']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read baseline {path}: {exc}")
+        self.stdout.write(f"\nAgainst {path}:")
+        for name, row in current.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            delta = row['p95_ms'] - before['p95_ms']
+            pct = 100 * delta / before['p95_ms'] if before['p95_ms'] else 0
+            line = (f"{name:<22} p95 {before['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms ({pct:+.0f}%), "
+                    f"queries {before['queries']} -> {row['queries']}")
+            slower = pct > 20 or row['queries'] > before['queries']
+            self.stdout.write(self.style.WARNING(line) if slower else line)
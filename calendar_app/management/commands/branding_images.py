@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from calendar_app.branding_images import delete_variants, generate_variants
+from calendar_app.models import Branding
+
+
+class Command(BaseCommand):
+    help = ("Regenerate the logo renditions (favicon, header, touch icon in WebP and JPEG). "
+            "Saving the branding form does this automatically; run it for logos uploaded before.")
+
+    def handle(self, *args, **options):
+        branding = Branding.objects.filter(pk=Branding.SINGLETON_PK).first()
+        if branding is None or not branding.logo:
+            self.stdout.write("No logo uploaded; nothing to do.")
+            return
+        try:
+            with branding.logo.open('rb') as logo:
+                variants = generate_variants(logo)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {branding.logo.name}: {exc}")
+        delete_variants(branding.logo_variants, keep=variants)
+        branding.logo_variants = variants
+        branding.save(update_fields=['logo_variants'])
+        for slot, formats in variants.items():
+            self.stdout.write(f"{slot}: {', '.join(formats.values())}")
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TAILWINDCSS_VERSION = 'v3.4.17'
+CONFIG = settings.BASE_DIR / 'tailwind.config.js'
+SOURCE = settings.BASE_DIR / 'calendar_app' / 'assets' / 'app.css'
+OUTPUT = settings.BASE_DIR / 'calendar_app' / 'static' / 'calendar_app' / 'css' / 'app.css'
+
+
+class Command(BaseCommand):
+    help = ("Compile the Tailwind CSS bundle (only the classes the templates use, minified). "
+            "Run before collectstatic, which fingerprints and compresses it.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help="Rebuild whenever a template changes.")
+        parser.add_argument('--tailwind-version', default=TAILWINDCSS_VERSION,
+                            help=f"Tailwind CSS standalone CLI release (default {TAILWINDCSS_VERSION}).")
+
+    def handle(self, *args, **options):
+        # The standalone CLI is downloaded on first use, so no Node toolchain is needed
+        try:
+            import pytailwindcss
+            from pytailwindcss.exceptions import PyTailwindCssException
+        except ImportError:
+            raise CommandError("pytailwindcss is not installed; pip install -r requirements.txt")
+
+        cli_args = ['-c', str(CONFIG), '-i', str(SOURCE), '-o', str(OUTPUT), '--minify']
+        if options['watch']:
+            cli_args.append('--watch')
+        OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            result = pytailwindcss.run(cli_args, cwd=settings.BASE_DIR, live_output=True, auto_install=True,
+                                       version=options['tailwind_version'])
+        except PyTailwindCssException as exc:
+            raise CommandError(exc)
+        if result.returncode:
+            raise CommandError(f"tailwindcss exited with status {result.returncode}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {OUTPUT} ({OUTPUT.stat().st_size} bytes)"))
@@ -0,0 +1,98 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from calendar_app.api import after, encode_cursor
+from calendar_app.event_windows import month_bounds, month_events, upcoming_queryset
+from calendar_app.models import RSVP, Event, MatchRegistration, RosterMember, User
+from calendar_app.recurrence import series_overlapping
+from calendar_app.registration_search import PAGE_SIZE, search, sort_ordering
+from calendar_app.reminders import one_offs_starting, recipients
+from calendar_app.team_scope import for_teams
+
+
+def members_lookup():
+    # The lookup behind rosters.attach_shared_members()
+    return RosterMember.objects.filter(Q(normalized_name__in=['alice', 'bob']) | Q(discord_handle__in=['bob#0420']))
+
+
+def hot_queries():
+    # The main query behind each view, with representative parameters, as
+    # (label, queryset, index_walk_ok). Plans do not depend on the rows
+    # existing, so placeholder ids are fine. index_walk_ok marks listings
+    # that read a whole index in order by design.
+    now = timezone.now()
+    cursor = encode_cursor(now, 1)
+    return [
+        ('dashboard: month grid', month_events(now.year, now.month), False),
+        ('dashboard: month series', series_overlapping(*month_bounds(now.year, now.month)), False),
+        ('dashboard: upcoming page', upcoming_queryset(now)[:13], False),
+        ('dashboard: team-scoped page', upcoming_queryset(now, queryset=for_teams(Event.objects.all(), [1, 2]))[:13], False),
+        ('dashboard: user rsvps', RSVP.objects.filter(user_id=1, event_id__in=[1, 2, 3]).values_list('event_id', 'status'), False),
+        ('rsvp_event: lookup', RSVP.objects.filter(user_id=1, event_id=1), False),
+        ('player_list', User.objects.filter(role='player').order_by('username'), False),
+        ('register_team: existing', MatchRegistration.objects.filter(user_id=1)[:1], False),
+        ('admin_registrations: shared members', members_lookup(), False),
+        ('admin_registrations: page', MatchRegistration.objects.order_by(*sort_ordering('newest'))[:PAGE_SIZE + 1], True),
+        ('admin_registrations: by team', MatchRegistration.objects.order_by(*sort_ordering('team'))[:PAGE_SIZE + 1], True),
+        ('admin_registrations: search', search(MatchRegistration.objects.order_by(*sort_ordering('newest')), 'alpha')[:PAGE_SIZE + 1], False),
+        ('export_attendance: one event', RSVP.objects.filter(event_id=1, status='attending').order_by('id').values_list('user__username', 'event__title'), False),
+        ('send_reminders: due window', one_offs_starting(now, now + datetime.timedelta(hours=24)), False),
+        ('send_reminders: recipients', recipients([1, 2, 3]), False),
+        ('api: events page', after(Event.objects.order_by('start_time', 'id'), 'start_time', cursor)[:101], True),
+        ('api: events since', after(Event.objects.order_by('updated_at', 'id'), 'updated_at', cursor)[:101], True),
+        ('api: user rsvps since', after(RSVP.objects.filter(user_id=1).order_by('updated_at', 'id'), 'updated_at', cursor)[:101], False),
+        ('api: registrations page', after(MatchRegistration.objects.order_by('created_at', 'id'), 'created_at', cursor)[:101], True),
+    ]
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+        # Tiny dev tables make Postgres prefer seq scans; ask for the indexed plan
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('EXPLAIN ' + sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def is_full_scan(line, index_walk_ok=False):
+    if connection.vendor == 'sqlite':
+        line = line.strip()
+        if not line.startswith('SCAN ') or line == 'SCAN CONSTANT ROW':
+            return False
+        # FTS5 MATCH is answered from the full-text index
+        if ' VIRTUAL TABLE INDEX ' in line:
+            return False
+        # "SCAN t USING INDEX i" still visits every row, just in index order
+        return ' USING ' not in line or not index_walk_ok
+    # With enable_seqscan off, Postgres only falls back to a seq scan when no index applies
+    return 'Seq Scan on' in line
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the main query of each view and fail if any of them does a full table scan."
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"Query plan check is not supported on {connection.vendor}.")
+
+        failures = []
+        for label, queryset, index_walk_ok in hot_queries():
+            plan = explain(queryset)
+            scans = [line for line in plan if is_full_scan(line, index_walk_ok)]
+            style = self.style.ERROR if scans else self.style.SUCCESS
+            self.stdout.write(style(f"{'FULL SCAN' if scans else 'ok':>9}  {label}"))
+            if options['verbosity'] > 1 or scans:
+                for line in plan:
+                    self.stdout.write(f"           {line}")
+            if scans:
+                failures.append(label)
+
+        if failures:
+            raise CommandError(f"Full table scan in: {', '.join(failures)}")
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calendar_app.importer import FORMATS, detect_format, import_events
+
+
+class Command(BaseCommand):
+    help = "Bulk-import events from a CSV or iCalendar (.ics) file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or ICS file to import.")
+        parser.add_argument('--format', choices=FORMATS, help="File format (default: from the file extension).")
+        parser.add_argument('--skip-invalid', action='store_true',
+                            help="Import the valid rows even when some rows are rejected.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; write nothing.")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError("Cannot tell the file format from its name; pass --format.")
+        started = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                report = import_events(lines, fmt, skip_invalid=options['skip_invalid'], dry_run=options['dry_run'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+        elapsed = time.perf_counter() - started
+
+        for line, message in report.errors:
+            self.stderr.write(f"line {line}: {message}")
+        summary = f"{report.rows} row(s) read, {len(report.errors)} rejected, {report.created} event(s) created in {elapsed:.2f}s"
+        if report.errors and not report.created and not options['dry_run']:
+            raise CommandError(f"{summary}. Nothing imported; fix the rows above or pass --skip-invalid.")
+        self.stdout.write(self.style.SUCCESS(summary) if report.ok else summary)
@@ -0,0 +1,40 @@
+import json
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from calendar_app.instrumentation import load_samples, summarize
+
+
+class Command(BaseCommand):
+    help = "Dump p50/p95/p99 request cost per URL name from PerfInstrumentationMiddleware samples."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Print the summary as JSON.")
+        parser.add_argument('--clear', action='store_true', help="Delete the collected samples afterwards.")
+
+    def handle(self, *args, **options):
+        directory = settings.PERF_SAMPLES_DIR
+        samples, duplicates = load_samples(directory)
+        summary = summarize(samples)
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2, sort_keys=True))
+        elif not summary:
+            self.stdout.write(f"No samples in {directory}. Is PERF_INSTRUMENTATION enabled?")
+        else:
+            header = f"{'url name':<40} {'reqs':>6} {'wall p50':>9} {'p95':>8} {'p99':>8} {'db p95':>8} {'q p50':>6} {'q p99':>6} {'dup':>4}"
+            self.stdout.write(header)
+            self.stdout.write('-' * len(header))
+            for name, row in sorted(summary.items(), key=lambda item: -item[1]['wall_ms_p95']):
+                self.stdout.write(
+                    f"{name:<40} {row['requests']:>6} {row['wall_ms_p50']:>9.1f} {row['wall_ms_p95']:>8.1f} "
+                    f"{row['wall_ms_p99']:>8.1f} {row['db_ms_p95']:>8.1f} {row['queries_p50']:>6} "
+                    f"{row['queries_p99']:>6} {row['duplicates_max']:>4}"
+                )
+            for name, (sql, n) in sorted(duplicates.items()):
+                self.stdout.write(self.style.WARNING(f"\n{name}: repeated {n}x: {sql[:200]}"))
+
+        if options['clear']:
+            shutil.rmtree(directory, ignore_errors=True)
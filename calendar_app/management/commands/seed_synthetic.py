@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from calendar_app.benchmarking import DEFAULT_VOLUMES, clear_synthetic, row_counts, seed
+
+
+class Command(BaseCommand):
+    help = "Seed a synthetic esports dataset (bench_* rows) for the benchmark command."
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f'--{name}', type=int, default=default, help=f"Number of {name} (default {default}).")
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help="Multiply every volume, e.g. 0.01 for a quick local dataset.")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed, so datasets are reproducible.")
+        parser.add_argument('--clear', action='store_true', help="Delete existing synthetic rows first.")
+
+    def handle(self, *args, **options):
+        volumes = {name: max(1, int(options[name] * options['scale'])) for name in DEFAULT_VOLUMES}
+        if options['clear']:
+            self.stdout.write("Clearing previous synthetic data")
+            clear_synthetic()
+        self.stdout.write(f"Seeding {volumes}")
+        seed(volumes, seed=options['seed'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f"Done. Row counts: {row_counts()}"))
@@ -0,0 +1,42 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from calendar_app.reminders import BATCH_SIZE, send_reminders
+
+
+class Command(BaseCommand):
+    help = ("Email reminders for events starting soon to players who are attending or have not answered. "
+            "Reminders already sent are skipped, so it is safe to run from cron every few minutes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lead-hours', type=float,
+                            help="Remind about events starting within this many hours (default: REMINDER_LEAD_HOURS).")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Sent reminders recorded per insert.")
+        parser.add_argument('--dry-run', action='store_true', help="Count the reminders due; send nothing.")
+        parser.add_argument('--every', type=int, metavar='SECONDS',
+                            help="Keep running, checking again every SECONDS, instead of exiting after one pass.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        lead = datetime.timedelta(hours=options['lead_hours']) if options['lead_hours'] else None
+        while True:
+            try:
+                self.run_once(lead, options)
+            except Exception as exc:
+                if not options['every']:
+                    raise CommandError(f"Sending failed; the unsent batch will be retried on the next run: {exc}")
+                # A worker outlives a flaky mail server; the failed batch is retried next pass
+                self.stderr.write(f"Sending failed, retrying in {options['every']}s: {exc}")
+            if not options['every']:
+                return
+            time.sleep(options['every'])
+
+    def run_once(self, lead, options):
+        started = time.perf_counter()
+        report = send_reminders(timezone.now(), lead, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{report.due} reminder(s) due, {report.sent} sent in {elapsed:.2f}s")
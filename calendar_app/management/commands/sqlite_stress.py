@@ -0,0 +1,105 @@
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from calendar_app.instrumentation import percentile
+from calendar_app.models import Event, User
+from calendar_app.rsvps import VALID_STATUSES, upsert_rsvps
+
+# SQLite's defaults as Django ships them: rollback journal, deferred transactions, 5s timeout
+PROFILES = {
+    'default': {},
+    'tuned': settings.SQLITE_TUNED_OPTIONS,
+}
+
+
+def add_database(alias, path, options):
+    # Register a scratch alias; configure_settings fills in the remaining defaults
+    config = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path), 'OPTIONS': dict(options)}
+    configured = connections.configure_settings({'default': dict(connections.settings['default']), alias: config})
+    connections.settings[alias] = configured[alias]
+
+
+def writer(alias, user, event_ids, writes, rng, latencies, errors):
+    statuses = sorted(VALID_STATUSES)
+    try:
+        for _ in range(writes):
+            started = time.perf_counter()
+            try:
+                # Read-then-write in one transaction, like rsvp_event under ATOMIC views
+                with transaction.atomic(using=alias):
+                    upsert_rsvps(user, {rng.choice(event_ids): rng.choice(statuses)}, using=alias)
+            except OperationalError as exc:
+                errors.append(str(exc))
+            else:
+                latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        connections[alias].close()
+
+
+class Command(BaseCommand):
+    help = ("Hammer a scratch SQLite database with concurrent RSVP writers, once with SQLite's "
+            "defaults and once with SQLITE_TUNED_OPTIONS, and compare errors and throughput.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200, help="Writes per writer thread.")
+        parser.add_argument('--profile', choices=[*PROFILES, 'both'], default='both')
+
+    def handle(self, *args, **options):
+        names = list(PROFILES) if options['profile'] == 'both' else [options['profile']]
+        header = f"{'profile':<10} {'ok':>7} {'locked':>7} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        with tempfile.TemporaryDirectory() as directory:
+            for name in names:
+                row = self.run_profile(name, Path(directory) / f'{name}.sqlite3', options['writers'], options['writes'])
+                self.stdout.write(
+                    f"{name:<10} {row['ok']:>7} {row['locked']:>7} {row['throughput']:>9.0f} "
+                    f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f}"
+                )
+
+    def run_profile(self, name, path, writers, writes):
+        alias = f'sqlite_stress_{name}'
+        add_database(alias, path, PROFILES[name])
+        try:
+            call_command('migrate', database=alias, verbosity=0)
+            User.objects.db_manager(alias).bulk_create([User(username=f'writer{i}') for i in range(writers)])
+            users = list(User.objects.using(alias).order_by('id'))
+            now = timezone.now()
+            Event.objects.db_manager(alias).bulk_create([
+                Event(title=f'Stress {i}', event_type='match', start_time=now) for i in range(20)
+            ])
+            event_ids = list(Event.objects.using(alias).values_list('id', flat=True))
+            connections[alias].close()
+
+            latencies, errors = [], []
+            threads = [
+                threading.Thread(target=writer, args=(alias, user, event_ids, writes, random.Random(i), latencies, errors))
+                for i, user in enumerate(users)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+
+        return {
+            'ok': len(latencies),
+            'locked': len(errors),
+            'throughput': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 50) if latencies else 0,
+            'p95_ms': percentile(latencies, 95) if latencies else 0,
+        }
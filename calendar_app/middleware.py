@@ -0,0 +1,103 @@
+import os
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .branding_images import DERIVED_DIR
+from .db_routing import PIN_COOKIE, PIN_SECONDS, replica_configured
+from .instrumentation import PerfStats, RequestMetrics, current_metrics, install_template_timer, server_timing
+
+
+class PerfInstrumentationMiddleware:
+    """
+    Opt-in (settings.PERF_INSTRUMENTATION) per-request cost accounting: SQL
+    query count, DB time, duplicate queries, template render time and wall
+    time. Adds a Server-Timing header and feeds the rolling per-URL-name
+    samples read by the perf_report command. When disabled Django drops the
+    middleware at startup, so it costs nothing.
+
+    Queries run while a StreamingHttpResponse is being consumed happen after
+    this middleware returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.stats = PerfStats(settings.PERF_SAMPLES_DIR)
+        install_template_timer()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+
+        sample = metrics.sample()
+        response['Server-Timing'] = server_timing(metrics, sample[0])
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else 'unresolved'
+        self.stats.add(url_name, sample, metrics.worst_duplicate())
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Sets a short-lived cookie after unsafe requests (the ones that write) so
+    the same client keeps reading from the primary until the replica has
+    caught up; see db_routing.read_from_replica. Dropped at startup when no
+    replica is configured.
+    """
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(PIN_COOKIE, '1', max_age=PIN_SECONDS, httponly=True,
+                                secure=settings.SESSION_COOKIE_SECURE, samesite='Lax')
+        return response
+
+
+class BrandingWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also serves the logo renditions under
+    MEDIA_URL/branding/derived/ with immutable cache headers; their names
+    carry a content hash. Renditions are written at runtime, after
+    WhiteNoise indexed its files at startup, so each one is added the first
+    time it is requested and dropped again once the file is deleted.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.derived_prefix = f"/{settings.MEDIA_URL.strip('/')}/{DERIVED_DIR}/"
+        self.derived_root = os.path.join(settings.MEDIA_ROOT, DERIVED_DIR)
+        if self.autorefresh:
+            self.add_files(self.derived_root, prefix=self.derived_prefix)
+
+    def __call__(self, request):
+        if not self.autorefresh and request.path_info.startswith(self.derived_prefix):
+            self.refresh_rendition(request.path_info)
+        return super().__call__(request)
+
+    def refresh_rendition(self, url):
+        name = url[len(self.derived_prefix):]
+        path = os.path.join(self.derived_root, name)
+        if '/' in name or not self.url_is_canonical(url) or not os.path.isfile(path):
+            self.files.pop(url, None)
+        elif url not in self.files:
+            self.add_file_to_dictionary(url, path)
+
+    def immutable_file_test(self, path, url):
+        return url.startswith(self.derived_prefix) or super().immutable_file_test(path, url)
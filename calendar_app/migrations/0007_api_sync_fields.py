@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0006_event_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['updated_at', 'id'], name='event_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchregistration',
+            index=models.Index(fields=['created_at', 'id'], name='matchreg_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='matchregistration',
+            index=models.Index(fields=['updated_at', 'id'], name='matchreg_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(fields=['updated_at', 'id'], name='rsvp_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['created_at', 'id'], name='team_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['updated_at', 'id'], name='team_updated_id_idx'),
+        ),
+    ]
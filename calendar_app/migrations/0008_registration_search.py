@@ -0,0 +1,74 @@
+from django.db import OperationalError, migrations
+
+# Frozen copy of calendar_app.registration_search as of this migration, so
+# later edits to that module cannot change what it creates. The live module
+# re-installs the index after every migrate (see signals.restore_search_index).
+FTS_TABLE = 'calendar_app_registration_fts'
+SEARCH_COLUMNS = ('team_name', 'discord_id', 'members')
+
+SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        team_name, discord_id, members,
+        content='calendar_app_matchregistration', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON calendar_app_matchregistration BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, team_name, discord_id, members)
+        VALUES (new.id, new.team_name, new.discord_id, new.members);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON calendar_app_matchregistration BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, team_name, discord_id, members)
+        VALUES ('delete', old.id, old.team_name, old.discord_id, old.members);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON calendar_app_matchregistration BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, team_name, discord_id, members)
+        VALUES ('delete', old.id, old.team_name, old.discord_id, old.members);
+        INSERT INTO {FTS_TABLE}(rowid, team_name, discord_id, members)
+        VALUES (new.id, new.team_name, new.discord_id, new.members);
+    END""",
+]
+
+POSTGRES_TRGM_SQL = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS matchreg_{column}_trgm ON calendar_app_matchregistration '
+    f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+    for column in SEARCH_COLUMNS
+]
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            try:
+                for sql in SQLITE_FTS_SQL:
+                    cursor.execute(sql)
+            except OperationalError:
+                # SQLite built without FTS5: search falls back to LIKE
+                return
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            for sql in POSTGRES_TRGM_SQL:
+                cursor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            for column in SEARCH_COLUMNS:
+                cursor.execute(f'DROP INDEX IF EXISTS matchreg_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0007_api_sync_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0008_registration_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(max_length=100)),
+                ('discord_handle', models.CharField(blank=True, max_length=100)),
+                ('registration', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster', to='calendar_app.matchregistration')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['normalized_name'], name='roster_name_idx'), models.Index(fields=['discord_handle'], name='roster_handle_idx')],
+                'constraints': [models.UniqueConstraint(fields=('registration', 'normalized_name'), name='roster_unique_member')],
+            },
+        ),
+    ]
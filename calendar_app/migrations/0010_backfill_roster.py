@@ -0,0 +1,74 @@
+import re
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+# Frozen copy of the members parser in calendar_app.rosters as of this
+# migration, so later changes to it cannot alter the backfill.
+NAME_LENGTH = 100
+HANDLE_RE = re.compile(r'^(?P<name>.+?)\s*[(\[]\s*@?(?P<handle>[^)\]]+?)\s*[)\]]$')
+SEPARATORS_RE = re.compile(r'[,;\n]')
+
+
+def normalize(name):
+    return ' '.join(name.split()).casefold()[:NAME_LENGTH]
+
+
+def parse_members(text):
+    seen = set()
+    members = []
+    for raw in SEPARATORS_RE.split(text or ''):
+        entry = ' '.join(raw.split())
+        if not entry:
+            continue
+        match = HANDLE_RE.match(entry)
+        if match:
+            name, handle = match['name'], match['handle']
+        elif entry.startswith('@') and len(entry) > 1:
+            name = handle = entry[1:]
+        else:
+            name, handle = entry, ''
+        key = normalize(name)
+        if key in seen:
+            continue
+        seen.add(key)
+        members.append((name[:NAME_LENGTH], normalize(handle)))
+    return members
+
+
+def roster_rows(registration, RosterMember):
+    return [
+        RosterMember(registration_id=registration.pk, name=name, normalized_name=normalize(name), discord_handle=handle)
+        for name, handle in parse_members(registration.members)
+    ]
+
+
+def backfill(apps, schema_editor):
+    # Batched and resumable: each batch commits on its own, and registrations
+    # that already have roster rows are skipped on a re-run
+    MatchRegistration = apps.get_model('calendar_app', 'MatchRegistration')
+    RosterMember = apps.get_model('calendar_app', 'RosterMember')
+    db = schema_editor.connection.alias
+    pending = MatchRegistration.objects.using(db).filter(roster__isnull=True).order_by('id')
+    last_id = 0
+    while True:
+        batch = list(pending.filter(id__gt=last_id).only('id', 'members')[:BATCH_SIZE])
+        if not batch:
+            break
+        with transaction.atomic(using=db):
+            rows = [row for registration in batch for row in roster_rows(registration, RosterMember)]
+            RosterMember.objects.using(db).bulk_create(rows, ignore_conflicts=True)
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('calendar_app', '0009_roster_member'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0010_backfill_roster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='branding',
+            name='logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0012_event_reminder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='api_token_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
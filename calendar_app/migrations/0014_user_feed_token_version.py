@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0013_user_api_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='feed_token_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
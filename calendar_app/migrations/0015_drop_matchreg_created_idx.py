@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # 0005 used to create matchreg_created_idx on (-created_at), which
+    # matchreg_created_id_idx (created_at, id) already serves. It has been
+    # removed from 0005; this drops it where the old 0005 already ran.
+
+    dependencies = [
+        ('calendar_app', '0014_user_feed_token_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL('DROP INDEX IF EXISTS matchreg_created_idx', migrations.RunSQL.noop),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
@@ -8,6 +9,10 @@ class User(AbstractUser):
         ('player', 'Player'),
     ]
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='player')
+    # Part of the signed API token; bumping it revokes every token issued so far (see api.api_token)
+    api_token_version = models.PositiveIntegerField(default=0, editable=False)
+    # Same for calendar feed URLs (see ics.feed_token); rotated from the dashboard
+    feed_token_version = models.PositiveIntegerField(default=0, editable=False)
     
     # Resolving clashes with default auth groups/permissions
     groups = models.ManyToManyField(
@@ -27,10 +32,24 @@ class User(AbstractUser):
         related_query_name="calendar_user",
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # player_list: filter(role=...).order_by('username')
+            models.Index(fields=['role', 'username'], name='user_role_username_idx'),
+        ]
+
 class Team(models.Model):
     name = models.CharField(max_length=100)
     members = models.ManyToManyField(User, related_name='teams', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # API keyset pages and since= sync
+            models.Index(fields=['created_at', 'id'], name='team_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='team_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -48,7 +67,33 @@ class Event(models.Model):
     end_time = models.DateTimeField(null=True, blank=True) # Optional duration
     location = models.CharField(max_length=200, blank=True)
     teams = models.ManyToManyField(Team, related_name='events', blank=True)
+    # RRULE body, e.g. "FREQ=WEEKLY;BYDAY=TU,TH". Blank for one-off events.
+    recurrence = models.CharField(max_length=255, blank=True, default='',
+                                  help_text="Repeat rule, e.g. FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20270101T000000Z")
+    # Local dates (YYYY-MM-DD) on which an occurrence is skipped
+    recurrence_exceptions = models.JSONField(default=list, blank=True)
+    # End of the last occurrence, far future if open-ended; kept in save() for window queries
+    recurrence_until = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Month window and keyset pagination on (start_time, id)
+            models.Index(fields=['start_time', 'id'], name='event_start_id_idx'),
+            # Multi-day events carried into a month from before it
+            models.Index(fields=['end_time'], name='event_end_idx'),
+            # Recurring series still running in a window
+            models.Index(fields=['recurrence_until', 'start_time'], condition=~models.Q(recurrence=''),
+                         name='event_series_idx'),
+            # API since= sync
+            models.Index(fields=['updated_at', 'id'], name='event_updated_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .recurrence import series_until
+        self.recurrence_until = series_until(self) if self.recurrence else None
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title} ({self.get_event_type_display()})"
@@ -67,20 +112,84 @@ class RSVP(models.Model):
 
     class Meta:
         unique_together = ['user', 'event']
+        indexes = [
+            # Covers the per-user status lookup without touching the table
+            models.Index(fields=['user', 'event', 'status'], name='rsvp_user_event_status_idx'),
+            # Per-event counts grouped by status
+            models.Index(fields=['event', 'status'], name='rsvp_event_status_idx'),
+            # API keyset pages and since= sync
+            models.Index(fields=['updated_at', 'id'], name='rsvp_updated_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title}: {self.status}"
 
+class EventReminder(models.Model):
+    # Marks a reminder as sent, so reruns of send_reminders skip it
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='reminders')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_reminders')
+    # A recurring series gets one reminder per occurrence
+    occurrence_start = models.DateTimeField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also serves the "already sent for these events" lookup
+            models.UniqueConstraint(fields=['event', 'occurrence_start', 'user'], name='reminder_unique_occurrence'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.event_id} @ {self.occurrence_start:%Y-%m-%d %H:%M}"
+
 class Branding(models.Model):
+    SINGLETON_PK = 1
+    CACHE_KEY = 'calendar_app:branding'
+    # Bounds staleness across processes when the cache is per-process (locmem)
+    CACHE_TIMEOUT = 300
+
     logo = models.ImageField(upload_to='branding/', blank=True, null=True)
+    # {slot: {format: storage name}} of the resized renditions; see branding_images
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     primary_color = models.CharField(max_length=7, default='#c0705a') # Orange
     registration_open = models.BooleanField(default=False)  # Admin can toggle registration
     
     def save(self, *args, **kwargs):
         # Ensure singleton
-        if not self.pk and Branding.objects.exists():
+        if self.pk:
+            return super().save(*args, **kwargs)
+        if Branding.objects.exists():
             return
-        super().save(*args, **kwargs)
+        # Concurrent first writes all target the same pk, so only one insert
+        # can win; the losers leave the winner's row untouched.
+        self.pk = self.SINGLETON_PK
+        kwargs['force_insert'] = True
+        kwargs.pop('force_update', None)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            self.pk = None
+            self._state.adding = True
+
+    @classmethod
+    def load(cls):
+        # Cached singleton accessor; creates the default row on first use
+        branding = cache.get(cls.CACHE_KEY)
+        if branding is None:
+            branding = cls.objects.first()
+            if branding is None:
+                branding, _ = cls.objects.get_or_create(pk=cls.SINGLETON_PK, defaults={'primary_color': '#00ff9d'})
+            cache.set(cls.CACHE_KEY, branding, cls.CACHE_TIMEOUT)
+        return branding
+
+    @classmethod
+    def clear_cache(cls):
+        cache.delete(cls.CACHE_KEY)
+
+    @property
+    def logo_urls(self):
+        from .branding_images import variant_urls
+        return variant_urls(self.logo_variants)
 
     def __str__(self):
         return "Site Branding"
@@ -95,6 +204,33 @@ class MatchRegistration(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='matchreg_user_created_idx'),
+            # API keyset pages and since= sync
+            models.Index(fields=['created_at', 'id'], name='matchreg_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='matchreg_updated_id_idx'),
+        ]
     
     def __str__(self):
         return self.team_name
+
+class RosterMember(models.Model):
+    # One row per name in MatchRegistration.members, kept in sync by rosters.sync_roster()
+    registration = models.ForeignKey(MatchRegistration, on_delete=models.CASCADE, related_name='roster')
+    name = models.CharField(max_length=100)
+    # Case-folded, whitespace-collapsed name used for lookups
+    normalized_name = models.CharField(max_length=100)
+    discord_handle = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['registration', 'normalized_name'], name='roster_unique_member'),
+        ]
+        indexes = [
+            # "Which teams is this player on" and shared-member warnings
+            models.Index(fields=['normalized_name'], name='roster_name_idx'),
+            models.Index(fields=['discord_handle'], name='roster_handle_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.registration.team_name})"
@@ -0,0 +1,165 @@
+import copy
+import datetime
+import itertools
+
+from dateutil.rrule import rrulestr
+from django.utils import timezone
+
+from .models import Event
+
+# recurrence_until for open-ended series; a real value keeps window queries an index range
+OPEN_ENDED = datetime.datetime(9999, 12, 31, tzinfo=datetime.timezone.utc)
+# Most occurrences a series with COUNT or UNTIL may have; finding its end
+# walks all of them, so an unchecked COUNT=10000000 would hang a save
+MAX_OCCURRENCES = 2000
+# Most occurrences one expansion window yields; a backstop for rows saved
+# before check_rule enforced at most one occurrence a day
+MAX_WINDOW_OCCURRENCES = 2000
+SUB_DAILY_FREQS = {'HOURLY', 'MINUTELY', 'SECONDLY'}
+
+
+def parse_rule(rule, dtstart):
+    """
+    Build a dateutil rrule from an RRULE body such as
+    "FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20270101T000000Z". Expansion runs in
+    local time so a weekly 18:00 practice stays at 18:00 across DST.
+    Raises ValueError for an invalid rule.
+    """
+    rule = rule.strip()
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[6:]
+    return rrulestr(rule, dtstart=timezone.localtime(dtstart))
+
+
+def duration(event):
+    if event.end_time and event.end_time > event.start_time:
+        return event.end_time - event.start_time
+    return datetime.timedelta(0)
+
+
+def rule_parts(rule):
+    # {"FREQ": "WEEKLY", ...} from an RRULE body that parse_rule accepted
+    body = rule.strip().upper()
+    if body.startswith('RRULE:'):
+        body = body[6:]
+    return dict(part.split('=', 1) for part in body.split(';') if '=' in part)
+
+
+def is_finite(rule):
+    parts = rule.upper()
+    return 'UNTIL=' in parts or 'COUNT=' in parts
+
+
+def finite_starts(rule, dtstart):
+    # Every start of a series with UNTIL/COUNT; ValueError beyond MAX_OCCURRENCES
+    starts = list(itertools.islice(parse_rule(rule, dtstart), MAX_OCCURRENCES + 1))
+    if len(starts) > MAX_OCCURRENCES:
+        raise ValueError(f"a rule with COUNT or UNTIL may repeat at most {MAX_OCCURRENCES} times; "
+                         "leave both out for an open-ended series")
+    return starts
+
+
+def check_rule(rule, dtstart):
+    """
+    Validation for user-entered and imported rules; raises ValueError.
+    A series repeats at most once a day: every window it is expanded over
+    (month grid, feed, reminders) then holds at most one occurrence per day.
+    """
+    parse_rule(rule, dtstart)
+    parts = rule_parts(rule)
+    if parts.get('FREQ') in SUB_DAILY_FREQS or any(',' in parts.get(name, '') for name in ('BYHOUR', 'BYMINUTE', 'BYSECOND')):
+        raise ValueError("a series may repeat at most once a day; add another series for a second time of day")
+    if is_finite(rule):
+        finite_starts(rule, dtstart)
+
+
+def series_until(event):
+    # End of the last occurrence, or OPEN_ENDED for a series without UNTIL/COUNT
+    if not is_finite(event.recurrence):
+        return OPEN_ENDED
+    starts = finite_starts(event.recurrence, event.start_time)
+    if not starts:
+        return event.start_time
+    return starts[-1] + duration(event)
+
+
+def occurrence_starts(rule, dtstart, exceptions, window_start, window_end):
+    # Starts in [window_start, window_end), at most MAX_WINDOW_OCCURRENCES of them
+    skip = set(exceptions)
+    starts = itertools.takewhile(lambda s: s < window_end,
+                                 parse_rule(rule, dtstart).xafter(timezone.localtime(window_start), inc=True))
+    starts = (s for s in starts if s.date().isoformat() not in skip)
+    return list(itertools.islice(starts, MAX_WINDOW_OCCURRENCES))
+
+
+def occurrence(event, start):
+    # A display copy of the series row. The id stays the series id: RSVPs
+    # (and reminders' recipients) are per series, not per occurrence, and
+    # the dashboard says so next to the RSVP buttons.
+    occ = copy.copy(event)
+    occ.start_time = start
+    occ.end_time = start + duration(event) if event.end_time else None
+    occ.series = event
+    return occ
+
+
+def expand(event, window_start, window_end):
+    """
+    Occurrences of ``event`` that overlap [window_start, window_end).
+    One-off events are returned as-is when they overlap.
+    """
+    if not event.recurrence:
+        return [event]
+    # Multi-day occurrences that began before the window still overlap it
+    lookback = window_start - duration(event)
+    starts = occurrence_starts(
+        event.recurrence, event.start_time, tuple(event.recurrence_exceptions or ()),
+        lookback, window_end,
+    )
+    return [occurrence(event, start) for start in starts]
+
+
+def series_overlapping(window_start, window_end=None, queryset=None):
+    # Recurring series with occurrences after window_start (and before window_end, if given)
+    queryset = Event.objects.all() if queryset is None else queryset
+    queryset = queryset.exclude(recurrence='').filter(recurrence_until__gt=window_start)
+    if window_end is not None:
+        queryset = queryset.filter(start_time__lt=window_end)
+    return queryset
+
+
+def occurrences_between(window_start, window_end, queryset=None):
+    return list(iter_occurrences(series_overlapping(window_start, window_end, queryset), window_start, window_end))
+
+
+def next_occurrences(event, after, after_id=None, limit=1):
+    """
+    Up to ``limit`` occurrences ordered after the keyset position
+    (after, after_id): strictly later starts, or the same start with a
+    higher id. With after_id None, starts at ``after`` are included.
+    """
+    skip = set(event.recurrence_exceptions or ())
+    rule = parse_rule(event.recurrence, event.start_time)
+    results = []
+    for start in rule.xafter(timezone.localtime(after), inc=True):
+        if start == after and after_id is not None and event.id <= after_id:
+            continue
+        if start.date().isoformat() in skip:
+            continue
+        results.append(occurrence(event, start))
+        if len(results) >= limit:
+            break
+    return results
+
+
+def merge_upcoming(events, series, after, after_id, limit):
+    # Merge a keyset page of one-off events with the next occurrences of each series
+    merged = list(events)
+    for event in series:
+        merged.extend(next_occurrences(event, after, after_id, limit))
+    merged.sort(key=lambda e: (e.start_time, e.id))
+    return merged[:limit + 1]
+
+
+def iter_occurrences(series, window_start, window_end):
+    return itertools.chain.from_iterable(expand(event, window_start, window_end) for event in series)
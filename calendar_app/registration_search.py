@@ -0,0 +1,160 @@
+import base64
+import json
+
+from django.db import OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_datetime
+
+from .models import MatchRegistration
+
+PAGE_SIZE = 50
+FTS_TABLE = 'calendar_app_registration_fts'
+SEARCH_COLUMNS = ('team_name', 'discord_id', 'members')
+
+# sort name -> (field, descending, unique). Every sort walks an index:
+# (created_at, id) for the date sorts, the unique team_name index otherwise.
+SORTS = {
+    'newest': ('created_at', True, False),
+    'oldest': ('created_at', False, False),
+    'team': ('team_name', False, True),
+}
+DEFAULT_SORT = 'newest'
+
+SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        team_name, discord_id, members,
+        content='calendar_app_matchregistration', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON calendar_app_matchregistration BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, team_name, discord_id, members)
+        VALUES (new.id, new.team_name, new.discord_id, new.members);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON calendar_app_matchregistration BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, team_name, discord_id, members)
+        VALUES ('delete', old.id, old.team_name, old.discord_id, old.members);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON calendar_app_matchregistration BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, team_name, discord_id, members)
+        VALUES ('delete', old.id, old.team_name, old.discord_id, old.members);
+        INSERT INTO {FTS_TABLE}(rowid, team_name, discord_id, members)
+        VALUES (new.id, new.team_name, new.discord_id, new.members);
+    END""",
+]
+
+# icontains compiles to UPPER(col::text) LIKE UPPER(...), which these trigram indexes serve
+POSTGRES_TRGM_SQL = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS matchreg_{column}_trgm ON calendar_app_matchregistration '
+    f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+    for column in SEARCH_COLUMNS
+]
+
+_fts_aliases = set()
+
+
+def install_search_index(connection):
+    """
+    Create the search index for ``connection`` if it is missing: an FTS5
+    table kept in sync by triggers on SQLite, trigram indexes on
+    PostgreSQL. Idempotent; also run after every migrate because SQLite
+    table rebuilds drop triggers. Returns True when anything was created.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                           [f'{FTS_TABLE}_a_'])
+            if cursor.fetchone()[0] == 3:
+                return False
+            try:
+                for sql in SQLITE_FTS_SQL:
+                    cursor.execute(sql)
+            except OperationalError:
+                # SQLite built without FTS5: search falls back to LIKE
+                return False
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        return True
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for sql in POSTGRES_TRGM_SQL:
+                cursor.execute(sql)
+        return True
+    return False
+
+
+def has_fts(alias):
+    if alias not in _fts_aliases:
+        connection = connections[alias]
+        if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+            _fts_aliases.add(alias)
+    return alias in _fts_aliases
+
+
+def fts_query(text):
+    # Every whitespace-separated term must match the start of a token
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in text.split())
+
+
+def search(queryset, text):
+    text = text.strip()
+    if not text:
+        return queryset
+    if has_fts(queryset.db):
+        return queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_query(text)]))
+    condition = Q()
+    for column in SEARCH_COLUMNS:
+        condition |= Q(**{f'{column}__icontains': text})
+    return queryset.filter(condition)
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value, pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, field):
+    # Returns (value, id) or None for a missing/garbled cursor
+    if not cursor:
+        return None
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if field == 'created_at':
+            value = parse_datetime(value)
+        if value is None or not isinstance(pk, int):
+            return None
+    except (ValueError, TypeError):
+        return None
+    return value, pk
+
+
+def sort_ordering(sort):
+    field, descending, unique = SORTS[sort]
+    return [f'-{field}' if descending else field] + ([] if unique else ['-id' if descending else 'id'])
+
+
+def registration_page(text='', sort=DEFAULT_SORT, cursor=None, page_size=PAGE_SIZE):
+    """
+    One keyset page of registrations matching ``text`` in ``sort`` order.
+    Returns (queryset of all matches, page rows, next cursor or None); the
+    page costs the same however many registrations there are.
+    """
+    if sort not in SORTS:
+        sort = DEFAULT_SORT
+    field, descending, unique = SORTS[sort]
+    matches = search(MatchRegistration.objects.order_by(), text)
+
+    page = matches
+    position = decode_cursor(cursor, field)
+    if position:
+        value, pk = position
+        op = 'lt' if descending else 'gt'
+        if unique:
+            page = page.filter(**{f'{field}__{op}': value})
+        else:
+            page = page.filter(Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk}))
+    rows = list(page.order_by(*sort_ordering(sort))[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(getattr(rows[-1], field), rows[-1].id)
+    return matches, rows, next_cursor
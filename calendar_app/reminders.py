@@ -0,0 +1,136 @@
+"""
+Event reminders: one email per (occurrence, player) shortly before an
+event starts, for players whose RSVP is attending or pending and for
+members of the event's teams who have not answered yet. Each window costs
+a fixed number of queries, mail goes out over one reused connection, and
+every reminder the server accepted is recorded in EventReminder, a batch
+at a time, so reruns never repeat it. Run a single scheduler; see send_reminders.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef, Value
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .event_windows import sort_events
+from .models import RSVP, Event, EventReminder
+from .recurrence import occurrences_between
+
+BATCH_SIZE = 100
+REMIND_STATUSES = ('attending', 'pending')
+
+
+class Reminder:
+    def __init__(self, occurrence, user_id, username, email, status):
+        self.occurrence = occurrence
+        self.user_id = user_id
+        self.username = username
+        self.email = email
+        self.status = status
+
+    def marker(self):
+        return EventReminder(event_id=self.occurrence.id, occurrence_start=self.occurrence.start_time, user_id=self.user_id)
+
+    def message(self, connection):
+        context = {'event': self.occurrence, 'username': self.username, 'status': self.status,
+                   'dashboard_url': settings.SITE_URL.rstrip('/') + reverse('calendar_app:dashboard')}
+        subject = render_to_string('calendar_app/reminder_subject.txt', context).strip()
+        body = render_to_string('calendar_app/reminder_email.txt', context)
+        return EmailMessage(subject, body, to=[self.email], connection=connection)
+
+
+class ReminderReport:
+    def __init__(self):
+        self.due = 0
+        self.sent = 0
+
+
+def one_offs_starting(start, end):
+    # Served by the (start_time, id) index
+    return Event.objects.filter(start_time__gte=start, start_time__lt=end, recurrence='').order_by()
+
+
+def starting_between(start, end):
+    # One-off events and series occurrences starting in [start, end)
+    one_offs = one_offs_starting(start, end)
+    # Series expansion also yields multi-day occurrences that began earlier
+    occurrences = [occ for occ in occurrences_between(start, end) if occ.start_time >= start]
+    return sort_events(list(one_offs) + occurrences)
+
+
+def recipients(event_ids):
+    """
+    (event_id, user_id, username, email, status) for everyone to remind
+    about ``event_ids``, in one query: active users with an email whose
+    RSVP is attending or pending, plus members of the events' teams with no
+    RSVP at all (reported as pending). UNION drops duplicate team members.
+    """
+    explicit = (
+        RSVP.objects.filter(event_id__in=event_ids, status__in=REMIND_STATUSES, user__is_active=True, user__email__gt='')
+        .values_list('event_id', 'user_id', 'user__username', 'user__email', 'status')
+    )
+    answered = RSVP.objects.filter(event_id=OuterRef('event_id'), user_id=OuterRef('team__members'))
+    # One filter() call, so every team__members condition shares a single join
+    unanswered = (
+        Event.teams.through.objects.filter(
+            ~Exists(answered), event_id__in=event_ids,
+            team__members__is_active=True, team__members__email__gt='',
+        )
+        .annotate(status=Value('pending'))
+        .values_list('event_id', 'team__members', 'team__members__username', 'team__members__email', 'status')
+    )
+    return explicit.union(unanswered)
+
+
+def due_reminders(now, horizon):
+    # Reminders for occurrences starting in [now, horizon) that have not been sent yet
+    occurrences = starting_between(now, horizon)
+    if not occurrences:
+        return []
+    event_ids = {occ.id for occ in occurrences}
+    by_event = {}
+    for event_id, *recipient in recipients(event_ids):
+        by_event.setdefault(event_id, []).append(recipient)
+    sent = set(
+        EventReminder.objects.filter(event_id__in=event_ids, occurrence_start__gte=now, occurrence_start__lt=horizon)
+        .values_list('event_id', 'occurrence_start', 'user_id')
+    )
+    return [
+        Reminder(occ, user_id, username, email, status)
+        for occ in occurrences
+        for user_id, username, email, status in sorted(by_event.get(occ.id, ()))
+        if (occ.id, occ.start_time, user_id) not in sent
+    ]
+
+
+def send_reminders(now, lead=None, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Email every reminder due for events starting within ``lead`` of
+    ``now`` (default REMINDER_LEAD_HOURS). Messages go out one at a time
+    over the shared connection, since SMTP can fail partway through a
+    batch. Only the ones the server accepted are recorded, with one insert
+    per batch. When sending fails, the reminders already sent are recorded
+    and the error is re-raised; the next run retries the rest. Returns a
+    ReminderReport.
+    """
+    lead = lead or datetime.timedelta(hours=settings.REMINDER_LEAD_HOURS)
+    due = due_reminders(now, now + lead)
+    report = ReminderReport()
+    report.due = len(due)
+    if dry_run or not due:
+        return report
+
+    # One connection (one SMTP login) for the whole run, closed on exit
+    with get_connection(fail_silently=False) as connection:
+        for offset in range(0, len(due), batch_size):
+            sent = []
+            try:
+                for reminder in due[offset:offset + batch_size]:
+                    if connection.send_messages([reminder.message(connection)]):
+                        sent.append(reminder)
+            finally:
+                EventReminder.objects.bulk_create([r.marker() for r in sent], ignore_conflicts=True)
+                report.sent += len(sent)
+    return report
@@ -0,0 +1,108 @@
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import RosterMember
+
+NAME_LENGTH = 100
+# "Name (handle)" or "Name [handle]"
+HANDLE_RE = re.compile(r'^(?P<name>.+?)\s*[(\[]\s*@?(?P<handle>[^)\]]+?)\s*[)\]]$')
+SEPARATORS_RE = re.compile(r'[,;\n]')
+
+
+def normalize(name):
+    return ' '.join(name.split()).casefold()[:NAME_LENGTH]
+
+
+def parse_members(text):
+    """
+    [(name, discord_handle)] from a members field such as
+    "Alice, Bob (bob#0420)\\n@carol". Entries may be separated by commas,
+    semicolons or newlines; a handle is given in brackets or as @handle.
+    Repeated names are dropped.
+    """
+    seen = set()
+    members = []
+    for raw in SEPARATORS_RE.split(text or ''):
+        entry = ' '.join(raw.split())
+        if not entry:
+            continue
+        match = HANDLE_RE.match(entry)
+        if match:
+            name, handle = match['name'], match['handle']
+        elif entry.startswith('@') and len(entry) > 1:
+            name = handle = entry[1:]
+        else:
+            name, handle = entry, ''
+        key = normalize(name)
+        if key in seen:
+            continue
+        seen.add(key)
+        members.append((name[:NAME_LENGTH], normalize(handle)))
+    return members
+
+
+def roster_rows(registration):
+    return [
+        RosterMember(registration_id=registration.pk, name=name, normalized_name=normalize(name), discord_handle=handle)
+        for name, handle in parse_members(registration.members)
+    ]
+
+
+def sync_roster(registration):
+    # Rewrite the roster from registration.members; call after every save that may change it
+    with transaction.atomic():
+        RosterMember.objects.filter(registration=registration).delete()
+        RosterMember.objects.bulk_create(roster_rows(registration))
+
+
+def members_registered_elsewhere(members_text, registration=None):
+    """
+    Roster rows of other registrations that share a name or Discord handle
+    with ``members_text``: two indexed lookups, no text scanning.
+    """
+    members = parse_members(members_text)
+    names = {normalize(name) for name, _ in members}
+    handles = {handle for _, handle in members if handle}
+    if not names:
+        return []
+    clashes = RosterMember.objects.filter(Q(normalized_name__in=names) | Q(discord_handle__in=handles))
+    if registration is not None and registration.pk:
+        clashes = clashes.exclude(registration_id=registration.pk)
+    return list(clashes.select_related('registration').order_by('normalized_name'))
+
+
+def attach_shared_members(registrations):
+    """
+    Set ``shared_members`` on each registration: "Name (Team)" for every
+    entry of another team's roster that shares a name or Discord handle
+    with it. Shown to admins as a warning only; common names legitimately
+    appear on unrelated teams. Two indexed queries for the whole page.
+    """
+    registrations = list(registrations)
+    own = list(RosterMember.objects.filter(registration__in=registrations)
+               .values_list('registration_id', 'normalized_name', 'discord_handle'))
+    names = {name for _, name, _ in own}
+    handles = {handle for _, _, handle in own if handle}
+    by_name, by_handle = {}, {}
+    if names:
+        others = RosterMember.objects.filter(Q(normalized_name__in=names) | Q(discord_handle__in=handles))
+        for row in others.select_related('registration'):
+            by_name.setdefault(row.normalized_name, []).append(row)
+            if row.discord_handle:
+                by_handle.setdefault(row.discord_handle, []).append(row)
+    shared = {registration.pk: set() for registration in registrations}
+    for registration_id, name, handle in own:
+        for row in by_name.get(name, []) + by_handle.get(handle, []):
+            if row.registration_id != registration_id:
+                shared[registration_id].add(f"{row.name} ({row.registration.team_name})")
+    for registration in registrations:
+        registration.shared_members = sorted(shared[registration.pk])
+    return registrations
+
+
+def registrations_for_member(name):
+    # Teams a player is listed on
+    return [row.registration for row in
+            RosterMember.objects.filter(normalized_name=normalize(name)).select_related('registration')]
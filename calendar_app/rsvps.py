@@ -0,0 +1,27 @@
+from .live import publish_rsvps
+from .models import RSVP, Event
+
+VALID_STATUSES = {status for status, _ in RSVP.STATUS_CHOICES}
+MAX_BATCH = 500
+
+
+def upsert_rsvps(user, statuses, using=None):
+    """
+    Write {event_id: status} for ``user`` as a single INSERT ... ON CONFLICT
+    DO UPDATE, so repeated or concurrent submissions cannot trip the
+    (user, event) unique constraint. Unknown event ids are skipped.
+    Returns {event_id: status} for the rows written. ``using`` picks the
+    database alias (default routing when None).
+    """
+    existing = set(Event.objects.using(using).filter(id__in=statuses).values_list('id', flat=True))
+    written = {event_id: status for event_id, status in statuses.items() if event_id in existing}
+    if written:
+        RSVP.objects.using(using).bulk_create(
+            [RSVP(user=user, event_id=event_id, status=status) for event_id, status in written.items()],
+            update_conflicts=True,
+            unique_fields=['user', 'event'],
+            update_fields=['status', 'updated_at'],
+        )
+        # bulk_create sends no post_save, so announce the change here
+        publish_rsvps(user.pk, written, using=using)
+    return written
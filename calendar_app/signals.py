@@ -0,0 +1,116 @@
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .auth_backends import clear_cached_user
+from .fragments import bump_events_version
+from .live import publish_registration, publish_rsvps
+from .models import RSVP, Branding, Event, MatchRegistration, Team, User
+from .registration_search import install_search_index
+from .team_scope import bump_teams_version
+
+
+@receiver(post_save, sender=Branding)
+@receiver(post_delete, sender=Branding)
+def invalidate_branding(sender, **kwargs):
+    Branding.clear_cache()
+    # A reader may re-cache the old row before the write commits
+    transaction.on_commit(Branding.clear_cache)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    clear_cached_user(instance.pk)
+    transaction.on_commit(lambda: clear_cached_user(instance.pk))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+# Deleting a team drops its Event.teams rows without sending m2m_changed
+@receiver(post_delete, sender=Team)
+def invalidate_month_grids(sender, **kwargs):
+    bump_events_version()
+    transaction.on_commit(bump_events_version)
+
+
+@receiver(m2m_changed, sender=Event.teams.through)
+def invalidate_team_scoped_grids(sender, action, **kwargs):
+    # Grids are cached per team scope, so retagging an event changes them
+    if action.startswith('post_'):
+        bump_events_version()
+        transaction.on_commit(bump_events_version)
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+@receiver(post_delete, sender=Team)
+def invalidate_session_team_ids(sender, action='post_delete', **kwargs):
+    if action.startswith('post_'):
+        bump_teams_version()
+        transaction.on_commit(bump_teams_version)
+
+
+# The API's since= sync follows updated_at, which m2m writes do not touch.
+# Through model -> (model whose API rows list the relation, its field)
+SYNCED_RELATIONS = {
+    Event.teams.through: (Event, 'teams'),
+    Team.members.through: (Team, 'members'),
+}
+
+
+def touch(queryset):
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Event.teams.through)
+@receiver(m2m_changed, sender=Team.members.through)
+def touch_synced_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    model, field = SYNCED_RELATIONS[sender]
+    if not reverse and action.startswith('post_'):
+        touch(model.objects.filter(pk=instance.pk))
+    elif action in ('post_add', 'post_remove'):
+        touch(model.objects.filter(pk__in=pk_set))
+    elif action == 'pre_clear':
+        # pk_set is None for clear(); the rows are gone by post_clear
+        touch(model.objects.filter(**{field: instance}))
+
+
+@receiver(pre_delete, sender=Team)
+def touch_events_losing_team(sender, instance, **kwargs):
+    # The cascade removes Event.teams rows without sending m2m_changed
+    touch(Event.objects.filter(teams=instance))
+
+
+@receiver(pre_delete, sender=User)
+def touch_teams_losing_member(sender, instance, **kwargs):
+    touch(Team.objects.filter(members=instance))
+
+
+@receiver(post_save, sender=RSVP)
+def announce_rsvp(sender, instance, **kwargs):
+    publish_rsvps(instance.user_id, {instance.event_id: instance.status})
+
+
+@receiver(post_delete, sender=RSVP)
+def announce_rsvp_removed(sender, instance, origin=None, **kwargs):
+    # Skip cascades from deleting an event or user: one message per row would flood the streams
+    if isinstance(origin, RSVP) or getattr(origin, 'model', None) is RSVP:
+        publish_rsvps(instance.user_id, {instance.event_id: None})
+
+
+@receiver(post_save, sender=MatchRegistration)
+def announce_registration(sender, instance, **kwargs):
+    publish_registration(instance)
+
+
+@receiver(post_delete, sender=MatchRegistration)
+def announce_registration_removed(sender, instance, **kwargs):
+    publish_registration(instance, deleted=True)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using='default', **kwargs):
+    # SQLite rebuilds tables on many ALTERs, dropping the FTS sync triggers
+    if sender.name == 'calendar_app':
+        install_search_index(connections[using])
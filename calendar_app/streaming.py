@@ -0,0 +1,38 @@
+"""
+Streaming responses that stay streamed under ASGI. Django's ASGI handler
+reads a synchronous iterator with sync_to_async(list), so an export or feed
+would be built in full before its first byte went out; under ASGI the
+generator is instead advanced a batch of chunks per thread hop.
+"""
+import itertools
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+# Chunks pulled from the sync generator per sync_to_async call
+BATCH_CHUNKS = 32
+
+
+async def batched(iterator, size=BATCH_CHUNKS):
+    # Thread-sensitive, so the generator's DB cursor stays on one connection
+    iterator = iter(iterator)
+    take = sync_to_async(lambda: list(itertools.islice(iterator, size)))
+    try:
+        while chunks := await take():
+            for chunk in chunks:
+                yield chunk
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_response(request, stream, **kwargs):
+    """
+    StreamingHttpResponse over the sync generator ``stream``, wrapped as an
+    async iterator when the request came in over ASGI.
+    """
+    if isinstance(request, ASGIRequest):
+        stream = batched(stream)
+    return StreamingHttpResponse(stream, **kwargs)
@@ -0,0 +1,91 @@
+"""
+Which events a user sees: admins see everything; players see the events of
+their teams plus events tagged with no team, which are org-wide.
+Deleting a team untags its events, so the ones it was the only team of
+become org-wide; retag or delete them first to keep them private.
+"""
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+from .models import Event
+
+TEAMS_VERSION_KEY = 'calendar_app:teams:version'
+SESSION_KEY = 'calendar_app_team_ids'
+
+
+def is_admin(user):
+    return user.role == 'admin' or user.is_superuser
+
+
+def teams_version():
+    # Version of every team roster; seeded from the clock like events_version()
+    version = cache.get(TEAMS_VERSION_KEY)
+    if version is None:
+        cache.add(TEAMS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(TEAMS_VERSION_KEY)
+    return version
+
+
+def bump_teams_version():
+    # Called from membership signals; invalidates every session's cached team ids
+    try:
+        cache.incr(TEAMS_VERSION_KEY)
+    except ValueError:
+        cache.set(TEAMS_VERSION_KEY, time.time_ns(), None)
+
+
+def team_ids_for(user):
+    # None means unscoped (admins)
+    if is_admin(user):
+        return None
+    return sorted(user.teams.values_list('id', flat=True))
+
+
+def session_team_ids(request):
+    """
+    team_ids_for(request.user), kept in the session next to the roster
+    version it was read at, so scoping a request costs no query until a
+    roster changes.
+    """
+    if is_admin(request.user):
+        return None
+    version = teams_version()
+    cached = request.session.get(SESSION_KEY)
+    if cached and cached[0] == version:
+        return cached[1]
+    team_ids = team_ids_for(request.user)
+    request.session[SESSION_KEY] = [version, team_ids]
+    return team_ids
+
+
+async def asession_team_ids(request):
+    # session_team_ids() for async views
+    user = await request.auser()
+    if is_admin(user):
+        return None
+    version = await sync_to_async(teams_version)()
+    cached = await request.session.aget(SESSION_KEY)
+    if cached and cached[0] == version:
+        return cached[1]
+    team_ids = await sync_to_async(team_ids_for)(user)
+    await request.session.aset(SESSION_KEY, [version, team_ids])
+    return team_ids
+
+
+def for_teams(queryset, team_ids):
+    # Events tagged with one of ``team_ids`` or with no team at all; unchanged when team_ids is None
+    if team_ids is None:
+        return queryset
+    tags = Event.teams.through.objects.filter(event_id=OuterRef('pk'))
+    return queryset.filter(Exists(tags.filter(team_id__in=team_ids)) | ~Exists(tags))
+
+
+def scope_key(team_ids):
+    # Short cache-key component naming a team scope
+    if team_ids is None:
+        return 'all'
+    return hashlib.md5(','.join(map(str, team_ids)).encode()).hexdigest()[:12]
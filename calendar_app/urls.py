@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, live, views
 
 app_name = 'calendar_app'
 
@@ -9,12 +9,22 @@ urlpatterns = [
     path('logout/', views.user_logout, name='logout'),
     path('signup/', views.user_signup, name='signup'),
     path('create-event/', views.create_event, name='create_event'),
+    path('import-events/', views.import_events_view, name='import_events'),
     path('delete-event/<int:event_id>/', views.delete_event, name='delete_event'),
+    path('rsvp/batch/', views.rsvp_batch, name='rsvp_batch'),
     path('rsvp/<int:event_id>/<str:status>/', views.rsvp_event, name='rsvp_event'),
+    path('conflicts/', views.conflict_report, name='conflict_report'),
     path('settings/', views.settings_view, name='settings'),
     path('players/', views.player_list, name='player_list'),
     path('register-team/', views.register_team, name='register_team'),
     path('registrations/', views.admin_registrations, name='admin_registrations'),
+    path('registrations/export.<str:fmt>', views.export_registrations, name='export_registrations'),
+    path('attendance/export.<str:fmt>', views.export_attendance, name='export_attendance'),
     path('registrations/<int:reg_id>/edit/', views.edit_registration, name='edit_registration'),
     path('registrations/<int:reg_id>/delete/', views.delete_registration, name='delete_registration'),
+    path('api/<str:resource_name>/', api.resource_list, name='api_list'),
+    path('live/', live.updates, name='live_updates'),
+    path('feeds/rotate/', views.rotate_feed, name='rotate_feed'),
+    path('feeds/<str:token>/calendar.ics', views.user_calendar_feed, name='user_calendar_feed'),
+    path('feeds/<str:token>/teams/<int:team_id>/calendar.ics', views.team_calendar_feed, name='team_calendar_feed'),
 ]
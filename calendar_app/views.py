@@ -1,9 +1,37 @@
+import datetime
+import hashlib
+import io
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.http import Http404, HttpResponseNotFound, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from .models import Event, Team, Branding, RSVP, User, MatchRegistration
-from .forms import SignUpForm, LoginForm, EventForm, BrandingForm, MatchRegistrationForm # We will need to create these forms
+from .exports import ATTENDANCE_COLUMNS, REGISTRATION_COLUMNS, attendance_rows, csv_stream, registration_rows, xlsx_stream
+from .forms import SignUpForm, LoginForm, EventForm, EventImportForm, BrandingForm, MatchRegistrationForm
+from .db_routing import read_from_replica
+from .conflicts import conflicts_for, describe, find_conflicts
+from .event_windows import month_bounds
+from .importer import detect_format, import_events
+from .ics import calendar_stream, feed_token, rotate_feed_token, user_from_feed_token
+from .recurrence import iter_occurrences, series_overlapping
+from .registration_search import DEFAULT_SORT, SORTS, registration_page
+from .rosters import attach_shared_members, sync_roster
+from .rsvps import MAX_BATCH, VALID_STATUSES, upsert_rsvps
+from .streaming import streaming_response
+from .team_scope import asession_team_ids, for_teams, team_ids_for
 
 # Placeholder for forms - creating minimal inline for now or separate file later. 
 # For now, I'll rely on generic views or manual form handling to speed up, 
@@ -22,8 +50,7 @@ def user_login(request):
         from django.contrib.auth.forms import AuthenticationForm
         form = AuthenticationForm()
     
-    branding = Branding.objects.first()
-    return render(request, 'calendar_app/login.html', {'form': form, 'branding': branding})
+    return render(request, 'calendar_app/login.html', {'form': form})
 
 def user_logout(request):
     logout(request)
@@ -40,34 +67,61 @@ def user_signup(request):
     else:
         form = SignUpForm()
     
-    branding = Branding.objects.first()
-    return render(request, 'calendar_app/signup.html', {'form': form, 'branding': branding})
+    return render(request, 'calendar_app/signup.html', {'form': form})
 
 @login_required
-def dashboard(request):
-    events = Event.objects.all().order_by('start_time')
-    user_rsvps = RSVP.objects.filter(user=request.user).values_list('event_id', 'status')
-    rsvp_dict = {event_id: status for event_id, status in user_rsvps}
-    
-    # Annotate events for template usage without custom filters
-    for event in events:
-        event.user_status = rsvp_dict.get(event.id)
-    
+@read_from_replica
+async def dashboard(request):
     # Calendar Logic
     import calendar
     from django.utils import timezone
-    import datetime
+    from .aggregates import attach_rsvp_counts
+    from .event_windows import upcoming_events
+    from .fragments import month_grid_fragment
     
     # Get year and month from request or default to now
     now = timezone.now()
+    today = timezone.localdate(now)
     try:
-        year = int(request.GET.get('year', now.year))
-        month = int(request.GET.get('month', now.month))
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
     except ValueError:
-        year = now.year
-        month = now.month
+        year = today.year
+        month = today.month
+    if not 1 <= month <= 12 or not 1 <= year <= 9998:
+        year = today.year
+        month = today.month
+
+    # Only the visible month feeds the grid; the list is a keyset-paginated
+    # page of upcoming events, so neither grows with the event history.
+    # The grid itself is a shared fragment cached until an event changes.
+    # Players only see their teams' events; their team ids live in the session.
+    # The view is async; helpers without an async ORM path run in a worker thread.
+    user = await request.auser()
+    team_ids = await asession_team_ids(request)
+    month_grid_html, grid_ids = await sync_to_async(month_grid_fragment)(year, month, team_ids)
+    cursor = request.GET.get('after')
+    events, next_cursor = await sync_to_async(upcoming_events)(now=now, cursor=cursor, queryset=for_teams(Event.objects.all(), team_ids))
+
+    visible_ids = set(grid_ids) | {e.id for e in events}
+    user_rsvps = RSVP.objects.filter(user=user, event_id__in=visible_ids).values_list('event_id', 'status')
+    rsvp_dict = {event_id: status async for event_id, status in user_rsvps}
+    grid_rsvps = {event_id: rsvp_dict[event_id] for event_id in grid_ids if event_id in rsvp_dict}
+    
+    # Annotate events for template usage without custom filters. RSVPs are
+    # per series, so only a series' first card on the page gets the buttons.
+    seen_series = set()
+    for event in events:
+        event.user_status = rsvp_dict.get(event.id)
+        event.series_repeat = bool(event.recurrence) and event.id in seen_series
+        if event.recurrence:
+            seen_series.add(event.id)
+
+    is_admin = user.role == 'admin' or user.is_superuser
+    if is_admin:
+        # Counts and attendees for every card in a constant number of queries
+        await sync_to_async(attach_rsvp_counts)(events, with_attendees=True)
         
-    cal = calendar.monthcalendar(year, month)
     month_name = calendar.month_name[month]
     
     # Calculate Next/Prev Month
@@ -85,38 +139,25 @@ def dashboard(request):
         prev_month = month - 1
         prev_year = year
 
-    # Create valid date objects for the grid to compare with events
-    # We want a list of weeks, where each day has {day: int, events: []}
-    calendar_weeks = []
-    for week in cal:
-        week_data = []
-        for day in week:
-            if day == 0:
-                week_data.append({'day': 0, 'events': []})
-            else:
-                # Find events on this day
-                day_events = [e for e in events if e.start_time.year == year and e.start_time.month == month and e.start_time.day == day]
-                week_data.append({'day': day, 'events': day_events})
-        calendar_weeks.append(week_data)
-
-    branding = Branding.objects.first()
-    if not branding:
-        branding = Branding.objects.create(primary_color='#00ff9d')
-
     context = {
         'events': events,
-        'branding': branding,
+        'next_cursor': next_cursor,
+        'is_paged': bool(cursor),
         'rsvp_dict': rsvp_dict,
-        'is_admin': request.user.role == 'admin' or request.user.is_superuser,
-        'calendar_weeks': calendar_weeks,
+        'is_admin': is_admin,
+        'feed_url': request.build_absolute_uri(reverse('calendar_app:user_calendar_feed', args=[feed_token(user)])),
+        'month_grid_html': month_grid_html,
+        'grid_rsvps': grid_rsvps,
         'month_name': month_name,
         'year': year,
+        'month': month,
         'next_month': next_month,
         'next_year': next_year,
         'prev_month': prev_month,
         'prev_year': prev_year,
+        'live_user_id': user.pk,
     }
-    return render(request, 'calendar_app/dashboard.html', context)
+    return await sync_to_async(render)(request, 'calendar_app/dashboard.html', context)
 
 @login_required
 def create_event(request):
@@ -124,36 +165,130 @@ def create_event(request):
         messages.error(request, "Unauthorized")
         return redirect('calendar_app:dashboard')
         
+    conflicts = []
     if request.method == 'POST':
         form = EventForm(request.POST)
         if form.is_valid():
-            form.save()
-            messages.success(request, "Event created successfully!")
-            return redirect('calendar_app:dashboard')
+            event = form.save(commit=False)
+            conflicts = describe(conflicts_for(event, [team.id for team in form.cleaned_data['teams']]))
+            # Clashes are shown first; the admin can resubmit to save anyway
+            if not conflicts or request.POST.get('ignore_conflicts'):
+                event.save()
+                form.save_m2m()
+                if conflicts:
+                    messages.warning(request, f"Event created with {len(conflicts)} schedule conflict(s).")
+                else:
+                    messages.success(request, "Event created successfully!")
+                return redirect('calendar_app:dashboard')
     else:
         form = EventForm()
-    return render(request, 'calendar_app/create_event.html', {'form': form})
+    return render(request, 'calendar_app/create_event.html', {'form': form, 'conflicts': conflicts})
+
+@login_required
+def import_events_view(request):
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        messages.error(request, "Unauthorized")
+        return redirect('calendar_app:dashboard')
+
+    report = None
+    if request.method == 'POST':
+        form = EventImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            try:
+                report = import_events(lines, detect_format(upload.name), skip_invalid=form.cleaned_data['skip_invalid'])
+            except (UnicodeDecodeError, ValueError) as exc:
+                form.add_error('file', f"Could not read the file: {exc}")
+            else:
+                if report.created:
+                    messages.success(request, f"Imported {report.created} event(s).")
+                    if report.ok:
+                        return redirect('calendar_app:dashboard')
+                elif report.errors:
+                    messages.error(request, f"Nothing imported: {len(report.errors)} row(s) rejected.")
+    else:
+        form = EventImportForm()
+    return render(request, 'calendar_app/import_events.html', {'form': form, 'report': report})
+
+def wants_json(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.headers.get('Accept', '')
 
 @login_required
+@require_POST
 def rsvp_event(request, event_id, status):
-    event = get_object_or_404(Event, id=event_id)
-    rsvp, created = RSVP.objects.get_or_create(user=request.user, event=event)
-    if status in ['attending', 'unavailable']:
-        rsvp.status = status
-        rsvp.save()
+    if status not in VALID_STATUSES:
+        return JsonResponse({'error': 'Invalid status'}, status=400)
+
+    # Single upsert; safe against double-clicks racing on (user, event)
+    if not upsert_rsvps(request.user, {event_id: status}):
+        raise Http404("Event not found")
+
+    if wants_json(request):
+        return JsonResponse({'event_id': event_id, 'status': status})
     return redirect('calendar_app:dashboard')
 
+@login_required
+@require_POST
+def rsvp_batch(request):
+    # Accepts {"rsvps": [{"event_id": 1, "status": "attending"}, ...]} as JSON,
+    # or form data with repeated event_id fields and a single status.
+    try:
+        if request.content_type == 'application/json':
+            items = json.loads(request.body).get('rsvps', [])
+            statuses = {int(item['event_id']): item['status'] for item in items}
+        else:
+            status = request.POST.get('status')
+            statuses = {int(event_id): status for event_id in request.POST.getlist('event_id')}
+    except (ValueError, TypeError, KeyError, AttributeError, OverflowError):
+        return JsonResponse({'error': 'Malformed batch'}, status=400)
+
+    if not statuses or len(statuses) > MAX_BATCH:
+        return JsonResponse({'error': f'Send between 1 and {MAX_BATCH} RSVPs'}, status=400)
+    # JSON can carry lists or objects here, which are not hashable
+    if not all(isinstance(status, str) and status in VALID_STATUSES for status in statuses.values()):
+        return JsonResponse({'error': 'Invalid status'}, status=400)
+
+    written = upsert_rsvps(request.user, statuses)
+    return JsonResponse({
+        'rsvps': {str(event_id): status for event_id, status in written.items()},
+        'missing': sorted(set(statuses) - set(written)),
+    })
+
+@login_required
+def conflict_report(request):
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        messages.error(request, "Unauthorized")
+        return redirect('calendar_app:dashboard')
+
+    today = timezone.localdate()
+    try:
+        year = int(request.GET.get('year', today.year))
+        month = int(request.GET.get('month', today.month))
+        start, end = month_bounds(year, month)
+    except (ValueError, OverflowError):
+        year, month = today.year, today.month
+        start, end = month_bounds(year, month)
+
+    context = {
+        'conflicts': describe(find_conflicts(start, end)),
+        'month_start': start,
+        'year': year,
+        'month': month,
+    }
+    return render(request, 'calendar_app/conflicts.html', context)
+
 @login_required
 def settings_view(request):
     if request.user.role != 'admin' and not request.user.is_superuser:
         return redirect('calendar_app:dashboard')
     
-    branding = Branding.objects.first()
-    if not branding:
-        branding = Branding.objects.create(primary_color='#00ff9d')
+    branding = Branding.load()
+    # Edit the current row, not a possibly stale cached copy
+    branding.refresh_from_db()
     
     if request.method == 'POST':
-        form = BrandingForm(request.POST, instance=branding)
+        form = BrandingForm(request.POST, request.FILES, instance=branding)
         if form.is_valid():
             form.save()
             messages.success(request, "Branding updated!")
@@ -161,7 +296,7 @@ def settings_view(request):
     else:
         form = BrandingForm(instance=branding)
         
-    return render(request, 'calendar_app/settings.html', {'branding_form': form, 'branding': branding})
+    return render(request, 'calendar_app/settings.html', {'branding_form': form})
 
 @login_required
 def delete_event(request, event_id):
@@ -177,36 +312,34 @@ def delete_event(request, event_id):
     return redirect('calendar_app:dashboard')
 
 @login_required
+@read_from_replica
 def player_list(request):
     if request.user.role != 'admin' and not request.user.is_superuser:
         messages.error(request, "Unauthorized")
         return redirect('calendar_app:dashboard')
     
     players = User.objects.filter(role='player').order_by('username')
-    branding = Branding.objects.first()
     
     context = {
         'players': players,
-        'branding': branding,
     }
     return render(request, 'calendar_app/player_list.html', context)
 
 @login_required
 def register_team(request):
-    branding = Branding.objects.first()
+    branding = Branding.load()
     
     # Check if user already registered
     existing_registration = MatchRegistration.objects.filter(user=request.user).first()
     if existing_registration:
         context = {
-            'branding': branding,
             'registration': existing_registration,
             'already_registered': True,
         }
         return render(request, 'calendar_app/register_team.html', context)
     
     # Check if registration is open
-    if not branding or not branding.registration_open:
+    if not branding.registration_open:
         messages.error(request, "Team registration is currently closed.")
         return redirect('calendar_app:dashboard')
     
@@ -215,11 +348,12 @@ def register_team(request):
         if form.is_valid():
             registration = form.save(commit=False)
             registration.user = request.user
-            registration.save()
+            with transaction.atomic():
+                registration.save()
+                sync_roster(registration)
             
             # Show success page
             context = {
-                'branding': branding,
                 'registration': registration,
                 'just_registered': True,
             }
@@ -229,24 +363,38 @@ def register_team(request):
     
     context = {
         'form': form,
-        'branding': branding,
     }
     return render(request, 'calendar_app/register_team.html', context)
 
 @login_required
-def admin_registrations(request):
-    if request.user.role != 'admin' and not request.user.is_superuser:
+@read_from_replica
+async def admin_registrations(request):
+    user = await request.auser()
+    if user.role != 'admin' and not user.is_superuser:
         messages.error(request, "Unauthorized")
         return redirect('calendar_app:dashboard')
     
-    registrations = MatchRegistration.objects.all()
-    branding = Branding.objects.first()
-    
+    # One indexed keyset page at a time, so the page stays the same size
+    # however many teams register
+    query = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort', DEFAULT_SORT)
+    if sort not in SORTS:
+        sort = DEFAULT_SORT
+    cursor = request.GET.get('after')
+    matches, registrations, next_cursor = await sync_to_async(registration_page)(query, sort, cursor)
+    registrations = await sync_to_async(attach_shared_members)(registrations)
+
     context = {
         'registrations': registrations,
-        'branding': branding,
+        # A full COUNT (over FTS when searching) is paid once, on the first page
+        'total': None if cursor else await matches.acount(),
+        'query': query,
+        'sort': sort,
+        'sorts': list(SORTS),
+        'next_cursor': next_cursor,
+        'is_paged': bool(cursor),
     }
-    return render(request, 'calendar_app/admin_registrations.html', context)
+    return await sync_to_async(render)(request, 'calendar_app/admin_registrations.html', context)
 
 @login_required
 def edit_registration(request, reg_id):
@@ -257,19 +405,24 @@ def edit_registration(request, reg_id):
     
     if request.method == 'POST':
         # Handle AJAX inline edit
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or 'application/json' in request.headers.get('Accept', ''):
+        if wants_json(request):
             # Update single field
             for field in ['team_name', 'discord_id', 'members']:
                 if field in request.POST:
                     setattr(registration, field, request.POST[field])
-            registration.save()
-            from django.http import JsonResponse
+            with transaction.atomic():
+                registration.save()
+                sync_roster(registration)
             return JsonResponse({'status': 'success'})
         
         # Handle form submission
         form = MatchRegistrationForm(request.POST, instance=registration)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
+                sync_roster(registration)
+        else:
+            messages.error(request, ' '.join(error for errors in form.errors.values() for error in errors))
     
     return redirect('calendar_app:admin_registrations')
 
@@ -285,3 +438,103 @@ def delete_registration(request, reg_id):
         messages.success(request, "Registration deleted successfully!")
     
     return redirect('calendar_app:admin_registrations')
+
+# How far back calendar feeds reach; keeps feeds bounded as history grows
+FEED_HISTORY = datetime.timedelta(days=90)
+# How far ahead recurring series are expanded into feed occurrences
+FEED_HORIZON = datetime.timedelta(days=365)
+
+def calendar_feed_response(request, events, user, name):
+    now = timezone.now()
+    since, horizon = now - FEED_HISTORY, now + FEED_HORIZON
+    one_offs = events.filter(start_time__gte=since, recurrence='')
+    series = series_overlapping(since, horizon, events)
+    window = one_offs | series
+    rsvps = RSVP.objects.filter(user=user, event__in=window)
+
+    # Validators come from two small aggregates, so a client polling an
+    # unchanged calendar gets a 304 without the feed being regenerated.
+    # The date is included because the expanded window moves daily.
+    event_stats = window.aggregate(latest=Max('updated_at'), count=Count('id'))
+    rsvp_stats = rsvps.aggregate(latest=Max('updated_at'), count=Count('id'))
+    fingerprint = f"{timezone.localdate(now)}|{event_stats['latest']}|{event_stats['count']}|{rsvp_stats['latest']}|{rsvp_stats['count']}"
+    etag = '"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()
+    latest = max(filter(None, [event_stats['latest'], rsvp_stats['latest']]), default=None)
+    last_modified = int(latest.timestamp()) if latest else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        user_status = Subquery(RSVP.objects.filter(user=user, event=OuterRef('pk')).values('status')[:1])
+        feed_events = itertools.chain(
+            one_offs.annotate(user_status=user_status).order_by('start_time', 'id').iterator(chunk_size=500),
+            iter_occurrences(series.annotate(user_status=user_status), since, horizon),
+        )
+        response = streaming_response(request, calendar_stream(feed_events, name), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="calendar.ics"'
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, max-age=300'
+    return response
+
+@login_required
+@require_POST
+def rotate_feed(request):
+    rotate_feed_token(request.user)
+    messages.success(request, "New calendar link created. Subscriptions using the old link will stop updating.")
+    return redirect('calendar_app:dashboard')
+
+@require_GET
+def user_calendar_feed(request, token):
+    user = user_from_feed_token(token)
+    if user is None:
+        return HttpResponseNotFound()
+    return calendar_feed_response(request, for_teams(Event.objects.all(), team_ids_for(user)), user, "VOYAA")
+
+@require_GET
+def team_calendar_feed(request, token, team_id):
+    user = user_from_feed_token(token)
+    if user is None:
+        return HttpResponseNotFound()
+    teams = Team.objects.all()
+    if user.role != 'admin' and not user.is_superuser:
+        teams = teams.filter(members=user)
+    team = teams.filter(pk=team_id).first()
+    if team is None:
+        return HttpResponseNotFound()
+    return calendar_feed_response(request, team.events.all(), user, f"VOYAA - {team.name}")
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+def export_response(request, fmt, columns, rows, name):
+    # Streamed as it is generated; nothing is buffered beyond one chunk
+    stream = csv_stream(columns, rows) if fmt == 'csv' else xlsx_stream(columns, rows, sheet_name=name.title())
+    response = streaming_response(request, stream, content_type=EXPORT_CONTENT_TYPES[fmt])
+    stamp = timezone.localdate().isoformat()
+    response['Content-Disposition'] = f'attachment; filename="{name}-{stamp}.{fmt}"'
+    return response
+
+@login_required
+def export_registrations(request, fmt):
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        messages.error(request, "Unauthorized")
+        return redirect('calendar_app:dashboard')
+    if fmt not in EXPORT_CONTENT_TYPES:
+        raise Http404
+    return export_response(request, fmt, REGISTRATION_COLUMNS, registration_rows(), 'registrations')
+
+@login_required
+def export_attendance(request, fmt):
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        messages.error(request, "Unauthorized")
+        return redirect('calendar_app:dashboard')
+    if fmt not in EXPORT_CONTENT_TYPES:
+        raise Http404
+    event_id = request.GET.get('event')
+    status = request.GET.get('status')
+    if (event_id and not event_id.isdigit()) or (status and status not in VALID_STATUSES):
+        raise Http404
+    return export_response(request, fmt, ATTENDANCE_COLUMNS, attendance_rows(event_id, status), 'attendance')
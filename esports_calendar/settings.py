@@ -12,6 +12,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import warnings
+
+from decouple import config
+
+from .database import parse_database_url
 
 # ...
 
@@ -58,20 +63,30 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # WhiteNoise serves static files under runserver too, as in production
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'calendar_app',
 ]
 
 MIDDLEWARE = [
+    'calendar_app.middleware.PerfInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'calendar_app.middleware.BrandingWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'calendar_app.middleware.ReplicaPinMiddleware',
 ]
 
+# Per-request query/timing instrumentation; off unless PERF_INSTRUMENTATION=1.
+# Samples for `manage.py perf_report` are written to PERF_SAMPLES_DIR.
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION') == '1'
+PERF_SAMPLES_DIR = BASE_DIR / 'perf'
+
 ROOT_URLCONF = 'esports_calendar.urls'
 
 TEMPLATES = [
@@ -84,6 +99,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'calendar_app.context_processors.branding',
             ],
         },
     },
@@ -95,13 +111,86 @@ WSGI_APPLICATION = 'esports_calendar.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Applied on every new SQLite connection. WAL lets readers run alongside the
+# single writer, BEGIN IMMEDIATE takes the write lock up front so a transaction
+# never fails upgrading from a read lock, and the busy timeout (seconds) makes
+# writers queue instead of raising "database is locked".
+SQLITE_TUNED_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA busy_timeout=20000;'
+        'PRAGMA mmap_size=134217728;'  # 128 MiB
+        'PRAGMA cache_size=-32000;'    # 32 MiB
+        'PRAGMA temp_store=MEMORY;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 20,
+}
+
+# DATABASE_URL selects the engine (see esports_calendar/database.py); the
+# default is the tuned local SQLite file. SQLITE_TUNING=0 falls back to
+# SQLite's defaults (rollback journal, deferred transactions). SQLite keeps
+# persistent connections (CONN_MAX_AGE) per worker thread; PostgreSQL uses
+# a psycopg pool of DB_POOL_MIN..DB_POOL_MAX connections instead.
+DATABASE_OPTIONS = {
+    'base_dir': BASE_DIR,
+    'sqlite_options': SQLITE_TUNED_OPTIONS if config('SQLITE_TUNING', default=True, cast=bool) else {},
+    'conn_max_age': config('CONN_MAX_AGE', default=600, cast=int),
+    'pool_min': config('DB_POOL_MIN', default=2, cast=int),
+    'pool_max': config('DB_POOL_MAX', default=10, cast=int),
+}
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': parse_database_url(config('DATABASE_URL', default='sqlite:///db.sqlite3'), **DATABASE_OPTIONS),
 }
 
+# Optional read replica for the read-heavy views (calendar_app.db_routing).
+# Tests mirror it onto default.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = parse_database_url(DATABASE_REPLICA_URL, **DATABASE_OPTIONS)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['calendar_app.db_routing.ReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Shared Redis cache when REDIS_URL is set (requires the redis package),
+# otherwise a per-process local-memory cache.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'voyaa',
+        }
+    }
+
+
+# Sessions
+# SESSION_BACKEND=cached_db reads sessions from the cache and only touches
+# django_session on a miss or a write; signed_cookies needs no table at all
+# (the session lives in the cookie, so keep it small). cached_db is the
+# default only with a shared cache: per-process locmem copies would go stale.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = config('SESSION_BACKEND', default='cached_db' if REDIS_URL else 'db')
+if SESSION_BACKEND not in SESSION_BACKENDS:
+    raise ValueError(f"Unsupported SESSION_BACKEND: {SESSION_BACKEND!r} (use one of {', '.join(SESSION_BACKENDS)})")
+SESSION_ENGINE = SESSION_BACKENDS[SESSION_BACKEND]
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,6 +227,27 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# STATIC_STORAGE=manifest (set by the deploy config, see railway.json) serves
+# the content-hashed copies plus .gz/.br variants that collectstatic writes,
+# with far-future immutable cache headers; the CSS bundle is compiled first
+# by `manage.py build_css`. The plain default needs no collectstatic run,
+# which suits development and tests.
+STATIC_STORAGES = {
+    'plain': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    'manifest': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+}
+STATIC_STORAGE = config('STATIC_STORAGE', default='plain')
+if STATIC_STORAGE not in STATIC_STORAGES:
+    raise ValueError(f"Unsupported STATIC_STORAGE: {STATIC_STORAGE!r} (use one of {', '.join(STATIC_STORAGES)})")
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': STATIC_STORAGES[STATIC_STORAGE]},
+}
+if STATIC_STORAGE == 'plain':
+    # STATIC_ROOT only exists after collectstatic
+    warnings.filterwarnings('ignore', message='No directory at')
 
 # Media files (user uploads)
 MEDIA_URL = '/media/'
@@ -150,6 +260,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'calendar_app.User'
 
+# With a shared cache, request.user is loaded through it
+# (calendar_app.auth_backends); the stock backend stays listed so sessions
+# created before the switch still resolve. A per-process locmem cache can
+# only be invalidated in the process that saved the user, so other workers
+# would keep a demoted or deactivated user; it reads the database instead.
+AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+if REDIS_URL:
+    AUTHENTICATION_BACKENDS.insert(0, 'calendar_app.auth_backends.CachedModelBackend')
+
 LOGIN_URL = 'calendar_app:login'
 LOGIN_REDIRECT_URL = 'calendar_app:dashboard'
 LOGOUT_REDIRECT_URL = 'calendar_app:login'
+
+# Email
+# https://docs.djangoproject.com/en/5.2/topics/email/
+# Event reminders (`manage.py send_reminders`) go out through this backend;
+# set EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend locally.
+
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='VOYAA <no-reply@localhost>')
+
+# How far ahead of an event its reminder goes out, and the site address
+# used for links in emails (there is no request to build them from)
+REMINDER_LEAD_HOURS = config('REMINDER_LEAD_HOURS', default=24, cast=int)
+SITE_URL = config('SITE_URL', default='https://voyaa-production.up.railway.app')
@@ -0,0 +1,18 @@
+// Build with `python manage.py build_css`; see calendar_app/management/commands/build_css.py
+module.exports = {
+  // Only classes found here end up in the bundle
+  content: [
+    './calendar_app/templates/**/*.html',
+    './calendar_app/**/*.py',
+  ],
+  theme: {
+    extend: {
+      colors: {
+        // --primary-color is the branding colour, set on <html> by base.html
+        primary: 'color-mix(in srgb, var(--primary-color) calc(<alpha-value> * 100%), transparent)',
+        surface: '#ffffff',
+      },
+    },
+  },
+  plugins: [],
+}